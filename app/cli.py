@@ -0,0 +1,109 @@
+"""
+Maintenance commands.
+
+    python -m app.cli rebuild-marking-stats [--scenario-id ID ...]
+    python -m app.cli import-roster PATH [--class-id ID] [--chunk-size N] [--workers N]
+                                         [--link-existing]
+"""
+import argparse
+import sys
+
+from db.crud.marking_stats import MarkingStatsRepository
+
+
+def rebuild_marking_stats(db, scenario_ids=None) -> int:
+    """Recompute marking counters from scratch; returns scenarios written."""
+    return MarkingStatsRepository(db).recompute(scenario_ids)
+
+
+def import_roster(db, path, *, class_id=None, chunk_size=None, workers=None, link_existing=False):
+    """Stream the CSV roster at `path` into the database; returns the report."""
+    # Imported here so --help works without passlib installed.
+    from app.services.classes_service import ClassesService
+    from app.services.roster_import_service import RosterImportService
+    from db.crud.base_repository import IN_CHUNK_SIZE
+    from db.crud.classes import ClassRepository
+    from db.crud.users import ClassTeacherRepository, StudentsOfClassRepository, UsersRepository
+
+    classes = ClassesService(
+        ClassRepository(db), StudentsOfClassRepository(db), ClassTeacherRepository(db)
+    )
+    service = RosterImportService(UsersRepository(db), classes, workers=workers)
+    with open(path, newline="", encoding="utf-8-sig") as lines:
+        return service.import_csv(
+            lines,
+            class_id=class_id,
+            chunk_size=chunk_size or IN_CHUNK_SIZE,
+            link_existing=link_existing,
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-marking-stats",
+        help="Recompute scenario_marking_stats / requirement_feedback_stats",
+    )
+    rebuild.add_argument(
+        "--scenario-id",
+        type=int,
+        action="append",
+        dest="scenario_ids",
+        help="Only rebuild this scenario (repeatable); default is every scenario",
+    )
+
+    roster = commands.add_parser(
+        "import-roster",
+        help="Create users from a CSV roster (fname,lname,username,email,password)",
+    )
+    roster.add_argument("path", help="CSV file with a header row")
+    roster.add_argument("--class-id", type=int, help="Enroll every imported user in this class")
+    roster.add_argument("--chunk-size", type=int, help="Rows per transaction (default 500)")
+    roster.add_argument("--workers", type=int, help="Password hashing threads")
+    roster.add_argument(
+        "--link-existing",
+        action="store_true",
+        help="Enroll rows whose username and email match an existing account as that account",
+    )
+    return parser
+
+
+def main(argv=None, session_factory=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if session_factory is None:
+        # Imported here so --help works without a database driver.
+        from db.session import SessionLocal
+        session_factory = SessionLocal
+
+    with session_factory() as db:
+        if args.command == "rebuild-marking-stats":
+            written = rebuild_marking_stats(db, args.scenario_ids)
+            print(f"Rebuilt marking stats for {written} scenario(s)")
+        elif args.command == "import-roster":
+            report = import_roster(
+                db,
+                args.path,
+                class_id=args.class_id,
+                chunk_size=args.chunk_size,
+                workers=args.workers,
+                link_existing=args.link_existing,
+            )
+            print(
+                f"Imported {report.rows} row(s) in {report.seconds:.1f}s "
+                f"({report.rows_per_second:.0f} rows/s): {report.created} created, "
+                f"{report.existing} existing, {report.enrolled} enrolled, {report.failed} failed"
+            )
+            for line, message in report.errors:
+                print(f"line {line}: {message}", file=sys.stderr)
+            if report.failed > len(report.errors):
+                print(f"... and {report.failed - len(report.errors)} more", file=sys.stderr)
+            return 1 if report.failed else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,62 @@
-from fastapi import Depends, HTTPException
+import time
+
+from fastapi import Depends, HTTPException, Request, Response
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.helpers.jwt import decode_access_token
 from db.session import get_db
 from db.crud.users import UsersRepository
+from db.routing import on_first_write, stick_to_primary
+from db.unit_of_work import unit_of_work
 
 
 security = HTTPBearer()
 
+# Read-your-writes token: a request that writes returns this header, and a
+# client echoing it back keeps reading from the primary until it expires.
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+PRIMARY_STICKY_SECONDS = 5.0
+
+
+def get_routed_db(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    """
+    Session that reads from the replica unless this request (or, via the
+    X-Primary-Until token, a recent request from the same client) wrote.
+    """
+    try:
+        primary_until = float(request.headers.get(PRIMARY_UNTIL_HEADER, 0))
+    except ValueError:
+        primary_until = 0
+    if primary_until > time.time():
+        stick_to_primary(db)
+
+    def issue_token():
+        response.headers[PRIMARY_UNTIL_HEADER] = f"{time.time() + PRIMARY_STICKY_SECONDS:.3f}"
+
+    on_first_write(db, issue_token)
+    yield db
+
+
+def get_uow_db(db: Session = Depends(get_routed_db)):
+    """
+    Request-scoped unit of work: repository writes made while handling the
+    request are flushed and committed once when it finishes, or rolled back
+    if it raises. Depend on it with scope="function" so the commit happens
+    before the response is sent and a failed commit is not reported as a
+    success.
+    """
+    with unit_of_work(db):
+        yield db
+
 
 def get_current_user(
     token = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_routed_db)
 ):
     """
     Extract and validate JWT, then return the SQLAlchemy User model.
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 
-from app.routes import debug
+from app.routes import debug, feedback, users
+from db.crud.cache import enable_cache
+from db.models import ChatHistory, Requirements, Scenarios, Stakeholder, Users
 
 # from app.routes import auth
 # from app.routes import scenarios
@@ -9,7 +11,14 @@ from app.routes import debug
 
 app = FastAPI()
 
+# Hot primary-key lookups (current user, parent rows) served from the
+# repository cache; see db/crud/cache.py.
+for model in (Users, Scenarios, Requirements, Stakeholder, ChatHistory):
+    enable_cache(model, maxsize=4096, ttl=30.0)
+
 app.include_router(debug.router)
+app.include_router(feedback.router)
+app.include_router(users.router)
 
 # app.include_router(auth.router)
 # app.include_router(scenarios.router)
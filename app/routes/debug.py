@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from db.crud.cache import cache_stats
+from db.pool import pool_stats
+from db.request_stats import request_stats
+from db.session import engine, get_db, replica_engine
 from app.services.debug_services import DebugService
 
 
@@ -23,4 +26,24 @@ def state_db(db: Session = Depends(get_db)):
 @router.delete("/db")
 def clear_db(db: Session = Depends(get_db)):
     service = DebugService(db)
-    return service.clear_database()
\ No newline at end of file
+    return service.clear_database()
+
+
+# ---------------------------------------------------------
+# REPOSITORY CACHE STATS
+# ---------------------------------------------------------
+@router.get("/cache")
+def state_cache():
+    return cache_stats()
+
+
+# ---------------------------------------------------------
+# CONNECTION POOL STATS
+# ---------------------------------------------------------
+@router.get("/pool")
+def state_pool():
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(replica_engine),
+        "sessions": request_stats.stats(),
+    }
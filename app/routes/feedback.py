@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.helpers.dependencies import get_current_user, get_uow_db
+from app.schemas.requests import FeedbackItemRequest
+from app.schemas.responses import FeedbackResponse
+from app.services.feedback_service import FeedbackService
+from db.crud.chats import ChatMessageRepository
+from db.crud.feedback import FeedbackReferenceRepository
+from db.crud.marking_stats import MarkingStatsRepository
+from db.crud.scenarios import RequirementsRepository, ScenariosRepository
+from db.crud.users import StudentsOfClassRepository
+
+
+router = APIRouter(prefix="/feedback", tags=["feedback"])
+
+
+def get_feedback_service(db: Session = Depends(get_uow_db, scope="function")):
+    return FeedbackService(
+        FeedbackReferenceRepository(db),
+        RequirementsRepository(db),
+        ChatMessageRepository(db),
+        ScenariosRepository(db),
+        StudentsOfClassRepository(db),
+        MarkingStatsRepository(db),
+    )
+
+
+# ---------------------------------------------------------
+# ADD FEEDBACK (BATCH)
+# ---------------------------------------------------------
+@router.post("/batch", response_model=list[FeedbackResponse])
+def add_feedback_batch(
+    payload: list[FeedbackItemRequest],
+    user=Depends(get_current_user),
+    service: FeedbackService = Depends(get_feedback_service),
+):
+    try:
+        return service.add_feedback_batch(
+            [item.model_dump() for item in payload], marker_id=user.id
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
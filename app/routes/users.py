@@ -0,0 +1,49 @@
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.helpers.dependencies import get_current_user, get_uow_db
+from app.schemas.responses import RosterImportResponse
+from app.services.classes_service import ClassesService
+from app.services.roster_import_service import RosterImportService
+from db.crud.classes import ClassRepository
+from db.crud.users import ClassTeacherRepository, StudentsOfClassRepository, UsersRepository
+
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+def get_roster_import_service(db: Session = Depends(get_uow_db, scope="function")):
+    classes = ClassesService(
+        ClassRepository(db),
+        StudentsOfClassRepository(db),
+        ClassTeacherRepository(db),
+    )
+    return RosterImportService(UsersRepository(db), classes)
+
+
+# ---------------------------------------------------------
+# IMPORT ROSTER (CSV UPLOAD)
+# ---------------------------------------------------------
+@router.post("/import", response_model=RosterImportResponse)
+def import_roster(
+    class_id: int,
+    file: UploadFile = File(...),
+    user=Depends(get_current_user),
+    service: RosterImportService = Depends(get_roster_import_service),
+):
+    if not service.classes.is_teacher(class_id, user.id):
+        raise HTTPException(
+            status_code=403, detail="Only teachers of this class can import a roster"
+        )
+
+    # The upload is spooled to disk past a small size; read it back as a
+    # text stream so the roster is never held in memory whole.
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return service.import_csv(lines, class_id=class_id).as_dict()
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        lines.detach()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class RegisterRequest(BaseModel):
@@ -7,4 +9,10 @@ class RegisterRequest(BaseModel):
 
 class LoginRequest(BaseModel):
     email: str
-    password: str
\ No newline at end of file
+    password: str
+
+class FeedbackItemRequest(BaseModel):
+    feedback: str
+    scenario_id: Optional[int] = None
+    requirement_id: Optional[int] = None
+    chat_message_id: Optional[int] = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
 
 class UserResponse(BaseModel):
     id: int
@@ -13,4 +15,27 @@ class RegisterResponse(BaseModel):
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
-    user: UserResponse
\ No newline at end of file
+    user: UserResponse
+
+class FeedbackResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    feedback: str
+    scenario_id: int
+    requirement_id: Optional[int] = None
+    chat_message_id: Optional[int] = None
+
+class RosterImportError(BaseModel):
+    line: int
+    message: str
+
+class RosterImportResponse(BaseModel):
+    rows: int
+    created: int
+    existing: int
+    enrolled: int
+    failed: int
+    errors: list[RosterImportError]
+    seconds: float
+    rows_per_second: float
@@ -3,4 +3,5 @@ from .classes_service import ClassesService
 from .feedback_service import FeedbackService
 from .scenarios_service import ScenariosService
 from .users_service import UsersService
-from .debug_services import DebugService
\ No newline at end of file
+from .debug_services import DebugService
+from .async_chats_service import AsyncChatsService
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from db.crud.cascade import cascade_restore, cascade_soft_delete
+from db.crud.soft_delete import soft_delete_many, soft_delete_where
+from db.models import ChatHistory, ChatMessage, FeedbackReference
+from db.unit_of_work import unit_of_work
+
+
+class AsyncChatsService:
+    """
+    Async counterpart of ChatsService for the chat endpoints, built on
+    AsyncBaseRepository so requests wait on the database without holding
+    a threadpool worker. Method names and return values match ChatsService.
+
+    `stats_repo` is a MarkingStatsRepository bound to the AsyncSession's
+    sync_session; it is only used inside run_sync().
+    """
+
+    def __init__(self, chat_history_repo, chat_message_repo, stats_repo):
+        self.history = chat_history_repo
+        self.messages = chat_message_repo
+        self.stats = stats_repo
+
+    # ---------------------------------------------------------
+    # CHAT HISTORIES
+    # ---------------------------------------------------------
+    async def get_history(self, history_id: int):
+        """Return a single active chat history."""
+        return await self.history.get(history_id)
+
+    async def get_history_for_stakeholder(self, stakeholder_id: int, *, create: bool = True):
+        """
+        Return (and optionally create) the chat history for a stakeholder.
+        """
+        page = await self.history.list_page(limit=1, order="desc", stakeholder_id=stakeholder_id)
+        if page.items:
+            # Always return the most recently created active history.
+            return page.items[0]
+
+        if not create:
+            return None
+
+        return await self.history.create(stakeholder_id=stakeholder_id)
+
+    async def list_histories(self, *, stakeholder_id: Optional[int] = None):
+        """List chat histories, optionally filtered by stakeholder."""
+        filters = {}
+        if stakeholder_id is not None:
+            filters["stakeholder_id"] = stakeholder_id
+        return await self.history.list(**filters)
+
+    async def delete_history(self, history_id: int):
+        """Soft-delete a chat history, its messages and their feedback."""
+        counts = await self.history.db.run_sync(self._cascade, cascade_soft_delete, history_id)
+        if not counts.get(ChatHistory.__tablename__):
+            return None
+        return (await self.history.all(id=history_id))[0]
+
+    async def restore_history(self, history_id: int):
+        """Restore a chat history and the messages deleted with it."""
+        counts = await self.history.db.run_sync(self._cascade, cascade_restore, history_id)
+        if not counts.get(ChatHistory.__tablename__):
+            return None
+        return await self.get_history(history_id)
+
+    # ---------------------------------------------------------
+    # CHAT MESSAGES
+    # ---------------------------------------------------------
+    async def append_message(self, history_id: int, *, sent_by: str, message: str):
+        """
+        Append a message to a chat history.
+        Raises ValueError if the history does not exist.
+        """
+        history = await self.get_history(history_id)
+        if not history:
+            raise ValueError(f"Chat history {history_id} not found")
+
+        payload = {
+            "chat_history_id": history_id,
+            "sent_by": sent_by,
+            "message": message,
+        }
+        return await self.messages.create(**payload)
+
+    async def list_messages(self, history_id: int):
+        """Return all active messages for a chat history."""
+        history = await self.get_history(history_id)
+        if not history:
+            return []
+
+        return await self.messages.list(chat_history_id=history_id)
+
+    async def list_messages_page(self, history_id: int, *, after_id: Optional[int] = None, limit: int = 50):
+        """Return one keyset page of active messages for a chat history."""
+        return await self.messages.list_page(after_id=after_id, limit=limit, chat_history_id=history_id)
+
+    async def get_last_message(self, history_id: int):
+        """Return the newest active message in a history."""
+        history = await self.get_history(history_id)
+        if not history:
+            return None
+
+        page = await self.messages.list_page(limit=1, order="desc", chat_history_id=history_id)
+        return page.items[0] if page.items else None
+
+    async def delete_message(self, message_id: int):
+        """Soft-delete a single chat message."""
+        return await self.messages.delete(message_id)
+
+    async def delete_messages(self, message_ids: Iterable[int]):
+        """Soft-delete multiple chat messages with a single UPDATE."""
+        return await self.messages.db.run_sync(soft_delete_many, ChatMessage, list(message_ids))
+
+    async def clear_history(self, history_id: int):
+        """
+        Soft-delete all messages in a chat history with a single UPDATE.
+        Returns number of messages cleared.
+        """
+        history = await self.get_history(history_id)
+        if not history:
+            return 0
+
+        ids = await self.messages.db.run_sync(
+            lambda db: soft_delete_where(db, ChatMessage, chat_history_id=history_id)
+        )
+        return len(ids)
+
+    async def restore_message(self, message_id: int):
+        """Restore a soft-deleted chat message."""
+        return await self.messages.restore(message_id)
+
+    # ---------------------------------------------------------
+    # INTERNAL HELPERS
+    # ---------------------------------------------------------
+    def _cascade(self, db, cascade, history_id: int) -> dict:
+        """Run `cascade` on a history and refresh marking counters, in one transaction."""
+        with unit_of_work(db):
+            counts = cascade(db, ChatHistory, [history_id])
+            if counts.get(FeedbackReference.__tablename__):
+                self.stats.recompute_for_history(history_id)
+        return counts
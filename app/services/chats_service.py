@@ -2,6 +2,11 @@ from __future__ import annotations
 
 from typing import Iterable, Optional
 
+from db.crud.cascade import cascade_restore, cascade_soft_delete
+from db.crud.soft_delete import soft_delete_many, soft_delete_where
+from db.models import ChatHistory, ChatMessage, FeedbackReference
+from db.unit_of_work import unit_of_work
+
 
 class ChatsService:
     """
@@ -9,11 +14,15 @@ class ChatsService:
     - create chat history
     - append messages
     - list messages
+
+    `stats_repo` is the MarkingStatsRepository on the same session; cascades
+    that touch message feedback refresh the marking counters through it.
     """
 
-    def __init__(self, chat_history_repo, chat_message_repo):
+    def __init__(self, chat_history_repo, chat_message_repo, stats_repo):
         self.history = chat_history_repo
         self.messages = chat_message_repo
+        self.stats = stats_repo
 
     # ---------------------------------------------------------
     # CHAT HISTORIES
@@ -44,19 +53,25 @@ class ChatsService:
         return self.history.list(**filters)
 
     def delete_history(self, history_id: int):
-        """Soft-delete a chat history and its messages."""
-        history = self.get_history(history_id)
-        if not history:
-            return None
-
-        for message in self.list_messages(history_id):
-            self.delete_message(message.id)
-
-        return self.history.delete(history_id)
+        """
+        Soft-delete a chat history, its messages and their feedback.
+        Runs one UPDATE per table regardless of the number of messages.
+        """
+        with unit_of_work(self.history.db):
+            counts = cascade_soft_delete(self.history.db, ChatHistory, [history_id])
+            if not counts.get(ChatHistory.__tablename__):
+                return None
+            self._recompute_stats(history_id, counts)
+        return self.history.all(id=history_id)[0]
 
     def restore_history(self, history_id: int):
-        """Restore a previously deleted chat history."""
-        return self.history.restore(history_id)
+        """Restore a chat history and the messages deleted with it."""
+        with unit_of_work(self.history.db):
+            counts = cascade_restore(self.history.db, ChatHistory, [history_id])
+            if not counts.get(ChatHistory.__tablename__):
+                return None
+            self._recompute_stats(history_id, counts)
+        return self.get_history(history_id)
 
     # ---------------------------------------------------------
     # CHAT MESSAGES
@@ -85,6 +100,13 @@ class ChatsService:
 
         return self.messages.list(chat_history_id=history_id)
 
+    def list_messages_page(self, history_id: int, *, after_id: Optional[int] = None, limit: int = 50):
+        """
+        Return one keyset page of active messages for a chat history.
+        Use `page.next_after_id` as the cursor for the following page.
+        """
+        return self.messages.list_page(after_id=after_id, limit=limit, chat_history_id=history_id)
+
     def get_last_message(self, history_id: int):
         """Return the newest active message in a history."""
         messages = self.list_messages(history_id)
@@ -98,22 +120,31 @@ class ChatsService:
         return self.messages.delete(message_id)
 
     def delete_messages(self, message_ids: Iterable[int]):
-        """Soft-delete multiple chat messages."""
-        results = []
-        for message_id in message_ids:
-            results.append(self.delete_message(message_id))
-        return results
+        """
+        Soft-delete multiple chat messages with a single UPDATE.
+        Returns the ids that were deleted.
+        """
+        return soft_delete_many(self.messages.db, ChatMessage, message_ids)
 
     def clear_history(self, history_id: int):
         """
-        Soft-delete all messages in a chat history.
+        Soft-delete all messages in a chat history with a single UPDATE.
         Returns number of messages cleared.
         """
-        messages = self.list_messages(history_id)
-        for message in messages:
-            self.delete_message(message.id)
-        return len(messages)
+        history = self.get_history(history_id)
+        if not history:
+            return 0
+
+        return len(soft_delete_where(self.messages.db, ChatMessage, chat_history_id=history_id))
 
     def restore_message(self, message_id: int):
         """Restore a soft-deleted chat message."""
-        return self.messages.restore(message_id)
\ No newline at end of file
+        return self.messages.restore(message_id)
+
+    # ---------------------------------------------------------
+    # INTERNAL HELPERS
+    # ---------------------------------------------------------
+    def _recompute_stats(self, history_id: int, counts: dict):
+        """Refresh marking counters when a cascade touched message feedback."""
+        if counts.get(FeedbackReference.__tablename__):
+            self.stats.recompute_for_history(history_id)
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 from typing import Iterable
 
+from db.crud.base_repository import IN_CHUNK_SIZE
+from db.crud.cache import invalidate
+from db.crud.soft_delete import with_deleted
 from db.models import ClassTeacher, StudentsOfClass
+from db.unit_of_work import commit_or_flush, unit_of_work
+from db.utils import loaded_values, restore_loaded, upsert_insert
 
 
 class ClassesService:
@@ -54,21 +59,38 @@ class ClassesService:
     # STUDENT MEMBERSHIP
     # ---------------------------------------------------------
     def add_student(self, class_id: int, user_id: int):
-        self._ensure_students_repo()
-
-        existing = self.students.list(class_id=class_id, user_id=user_id)
-        if existing:
-            return existing[0]
-
-        restored = self._restore_soft_deleted_student(class_id, user_id)
-        if restored:
-            return restored
-
-        return self.students.create(class_id=class_id, user_id=user_id)
+        return self.add_students(class_id, [user_id])[0]
 
     def add_students(self, class_id: int, user_ids: Iterable[int]):
+        """
+        Enroll every user in `user_ids` with one INSERT ... ON CONFLICT DO
+        UPDATE per IN_CHUNK_SIZE users: new memberships are inserted, deleted
+        ones restored and active ones left as they are. Returns the
+        memberships in input order.
+        """
         self._ensure_students_repo()
-        return [self.add_student(class_id, user_id) for user_id in user_ids]
+        user_ids = list(dict.fromkeys(user_ids))
+        db = self.students.db
+
+        by_user = {}
+        with unit_of_work(db):
+            for start in range(0, len(user_ids), IN_CHUNK_SIZE):
+                chunk = user_ids[start:start + IN_CHUNK_SIZE]
+                stmt = upsert_insert(db, StudentsOfClass).values(
+                    [{"class_id": class_id, "user_id": user_id} for user_id in chunk]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[StudentsOfClass.class_id, StudentsOfClass.user_id],
+                    set_={"deleted_at": None},
+                ).returning(StudentsOfClass)
+                rows = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+                invalidate(db, StudentsOfClass, [row.id for row in rows])
+                by_user.update((row.user_id, row) for row in rows)
+            snapshots = [(row, loaded_values(row)) for row in by_user.values()]
+
+        # The commit expired the memberships; put the returned values back.
+        restore_loaded(snapshots)
+        return [by_user[user_id] for user_id in user_ids]
 
     def list_students(self, class_id: int):
         self._ensure_students_repo()
@@ -97,6 +119,11 @@ class ClassesService:
 
         return self.class_teachers.create(class_id=class_id, teacher_id=teacher_id)
 
+    def is_teacher(self, class_id: int, teacher_id: int) -> bool:
+        """True when `teacher_id` actively teaches `class_id`."""
+        self._ensure_teachers_repo()
+        return bool(self.class_teachers.list(class_id=class_id, teacher_id=teacher_id))
+
     def list_teachers(self, class_id: int):
         self._ensure_teachers_repo()
         return self.class_teachers.list(class_id=class_id)
@@ -119,30 +146,10 @@ class ClassesService:
         if self.class_teachers is None:
             raise RuntimeError("ClassTeacher repository is required for this operation")
 
-    def _restore_soft_deleted_student(self, class_id: int, user_id: int):
-        db = self.students.db
-        record = (
-            db.query(StudentsOfClass)
-            .filter(
-                StudentsOfClass.class_id == class_id,
-                StudentsOfClass.user_id == user_id,
-                StudentsOfClass.deleted_at.is_not(None),
-            )
-            .first()
-        )
-        if not record:
-            return None
-
-        record.deleted_at = None
-        db.add(record)
-        db.commit()
-        db.refresh(record)
-        return record
-
     def _restore_soft_deleted_teacher(self, class_id: int, teacher_id: int):
         db = self.class_teachers.db
         record = (
-            db.query(ClassTeacher)
+            with_deleted(db.query(ClassTeacher))
             .filter(
                 ClassTeacher.class_id == class_id,
                 ClassTeacher.teacher_id == teacher_id,
@@ -155,6 +162,6 @@ class ClassesService:
 
         record.deleted_at = None
         db.add(record)
-        db.commit()
-        db.refresh(record)
+        if commit_or_flush(db):
+            db.refresh(record)
         return record
\ No newline at end of file
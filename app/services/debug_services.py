@@ -16,6 +16,7 @@ class DebugService:
         Return a summary of row counts for each table.
         Useful for debugging and verifying test data.
         """
+        from db.crud.soft_delete import with_deleted
         from db.models import (
             Users,
             Class,
@@ -30,6 +31,8 @@ class DebugService:
             ChatHistory,
             ChatMessage,
             FeedbackReference,
+            ScenarioMarkingStats,
+            RequirementFeedbackStats,
         )
 
         tables = {
@@ -46,11 +49,13 @@ class DebugService:
             "chat_history": ChatHistory,
             "chat_message": ChatMessage,
             "feedback_reference": FeedbackReference,
+            "scenario_marking_stats": ScenarioMarkingStats,
+            "requirement_feedback_stats": RequirementFeedbackStats,
         }
 
         state = {}
         for name, model in tables.items():
-            count = self.db.query(model).count()
+            count = with_deleted(self.db.query(model)).count()
             state[name] = count
 
         return state
@@ -78,9 +83,13 @@ class DebugService:
             ChatHistory,
             ChatMessage,
             FeedbackReference,
+            ScenarioMarkingStats,
+            RequirementFeedbackStats,
         )
 
         models = [
+            RequirementFeedbackStats,
+            ScenarioMarkingStats,
             FeedbackReference,
             ChatMessage,
             ChatHistory,
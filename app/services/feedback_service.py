@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from collections import Counter
-from typing import Optional
+from typing import Optional, Sequence
 
+from db.crud.base_repository import Page
 from db.models import MarkingStatus
+from db.unit_of_work import unit_of_work
 
 
 class FeedbackService:
@@ -20,11 +22,15 @@ class FeedbackService:
         requirements_repo=None,
         chat_message_repo=None,
         scenarios_repo=None,
+        students_repo=None,
+        stats_repo=None,
     ):
         self.feedback = feedback_repo
         self.requirements = requirements_repo
         self.chat_messages = chat_message_repo
         self.scenarios = scenarios_repo
+        self.students = students_repo
+        self.stats = stats_repo
 
     # ---------------------------------------------------------
     # FEEDBACK CREATION
@@ -43,7 +49,7 @@ class FeedbackService:
             "requirement_id": requirement_id,
             "chat_message_id": None,
         }
-        return self.feedback.create(**payload)
+        return self._create_feedback(payload)
 
     def add_feedback_to_message(self, chat_message_id: int, feedback_text: str, *, scenario_id: Optional[int] = None):
         """
@@ -59,7 +65,7 @@ class FeedbackService:
             "requirement_id": None,
             "chat_message_id": chat_message_id,
         }
-        return self.feedback.create(**payload)
+        return self._create_feedback(payload)
 
     def add_general_feedback(self, scenario_id: int, feedback_text: str):
         """Create feedback that is attached only to the scenario."""
@@ -69,7 +75,59 @@ class FeedbackService:
             "requirement_id": None,
             "chat_message_id": None,
         }
-        return self.feedback.create(**payload)
+        return self._create_feedback(payload)
+
+    def add_feedback_batch(self, items: Sequence[dict], *, marker_id: Optional[int] = None):
+        """
+        Create many feedback rows at once. Each item has "feedback" plus at most
+        one of "requirement_id" / "chat_message_id", and an optional
+        "scenario_id" (required for general feedback, otherwise a fallback).
+        All references are validated up front, so either every item is
+        created or a ValueError is raised and nothing is. With `marker_id`,
+        a PermissionError is raised unless that user teaches a class all the
+        scenario owners belong to.
+        """
+        requirement_ids = [item["requirement_id"] for item in items if item.get("requirement_id") is not None]
+        message_ids = [item["chat_message_id"] for item in items if item.get("chat_message_id") is not None]
+
+        requirements = self.requirements.get_many(requirement_ids) if self.requirements and requirement_ids else {}
+        message_scenarios = self.chat_messages.scenario_ids(message_ids) if self.chat_messages and message_ids else {}
+
+        rows = []
+        for item in items:
+            requirement_id = item.get("requirement_id")
+            chat_message_id = item.get("chat_message_id")
+            scenario_id = item.get("scenario_id")
+
+            if not item.get("feedback"):
+                raise ValueError("Feedback text is required")
+            if requirement_id is not None and chat_message_id is not None:
+                raise ValueError("Feedback can reference a requirement or a chat message, not both")
+
+            if requirement_id is not None and self.requirements is not None:
+                if requirement_id not in requirements:
+                    raise ValueError(f"Requirement {requirement_id} not found")
+                scenario_id = requirements[requirement_id].scenario_id
+            elif chat_message_id is not None and self.chat_messages is not None:
+                scenario_id = self._message_scenario(chat_message_id, message_scenarios, scenario_id)
+
+            if scenario_id is None:
+                raise ValueError("scenario_id is required for feedback that cannot be resolved")
+
+            rows.append({
+                "feedback": item["feedback"],
+                "scenario_id": scenario_id,
+                "requirement_id": requirement_id,
+                "chat_message_id": chat_message_id,
+            })
+
+        if marker_id is not None and rows:
+            self._ensure_can_mark(marker_id, {row["scenario_id"] for row in rows})
+
+        with unit_of_work(self.feedback.db):
+            created = self.feedback.create_many(rows)
+            self._track_feedback(created, +1)
+        return created
 
     # ---------------------------------------------------------
     # FEEDBACK RETRIEVAL
@@ -80,6 +138,10 @@ class FeedbackService:
     def list_feedback_for_scenario(self, scenario_id: int):
         return self.feedback.list(scenario_id=scenario_id)
 
+    def list_feedback_page(self, scenario_id: int, *, after_id: Optional[int] = None, limit: int = 50):
+        """Return one keyset page of active feedback for a scenario."""
+        return self.feedback.list_page(after_id=after_id, limit=limit, scenario_id=scenario_id)
+
     def list_feedback_for_requirement(self, requirement_id: int):
         return self.feedback.list(requirement_id=requirement_id)
 
@@ -87,10 +149,18 @@ class FeedbackService:
         return self.feedback.list(chat_message_id=chat_message_id)
 
     def delete_feedback(self, feedback_id: int):
-        return self.feedback.delete(feedback_id)
+        with unit_of_work(self.feedback.db):
+            feedback = self.feedback.delete(feedback_id)
+            if feedback is not None:
+                self._track_feedback([feedback], -1)
+        return feedback
 
     def restore_feedback(self, feedback_id: int):
-        return self.feedback.restore(feedback_id)
+        with unit_of_work(self.feedback.db):
+            feedback = self.feedback.restore(feedback_id)
+            if feedback is not None:
+                self._track_feedback([feedback], +1)
+        return feedback
 
     # ---------------------------------------------------------
     # MARKING / SUMMARY
@@ -99,36 +169,84 @@ class FeedbackService:
         """
         Compute aggregate feedback data for a scenario.
         Returns counts per requirement and chat message plus coverage insights.
+        Counting happens in SQL: one GROUP BY query plus one coverage query.
         """
-        feedback_items = self.list_feedback_for_scenario(scenario_id)
-        per_requirement = Counter(
-            item.requirement_id for item in feedback_items if item.requirement_id is not None
-        )
-        per_chat_message = Counter(
-            item.chat_message_id for item in feedback_items if item.chat_message_id is not None
-        )
+        total_feedback = 0
+        per_requirement = Counter()
+        per_chat_message = Counter()
+        for requirement_id, chat_message_id, count in self.feedback.counts_by_target(scenario_id):
+            total_feedback += count
+            if requirement_id is not None:
+                per_requirement[requirement_id] += count
+            if chat_message_id is not None:
+                per_chat_message[chat_message_id] += count
 
         coverage = None
         if self.requirements:
-            requirements = self.requirements.list(scenario_id=scenario_id)
-            total_requirements = len(requirements)
-            if total_requirements:
-                covered = sum(1 for req in requirements if per_requirement.get(req.id))
-                coverage = {
-                    "total_requirements": total_requirements,
-                    "requirements_with_feedback": covered,
-                    "coverage_ratio": covered / total_requirements,
-                }
-            else:
-                coverage = {"total_requirements": 0, "requirements_with_feedback": 0, "coverage_ratio": 0.0}
+            coverage = self._coverage(*self.feedback.requirement_coverage(scenario_id))
 
         return {
-            "total_feedback": len(feedback_items),
+            "total_feedback": total_feedback,
             "per_requirement": dict(per_requirement),
             "per_chat_message": dict(per_chat_message),
             "coverage": coverage,
         }
 
+    def get_marking_stats(self, scenario_id: int):
+        """
+        Marking summary read from the maintained counters instead of the
+        feedback table: total feedback, per-requirement counts and coverage.
+        Returns None if no counters exist for the scenario.
+        """
+        if self.stats is None:
+            raise RuntimeError("Marking stats repository is required to read marking stats")
+
+        stats = self.stats.get(scenario_id)
+        if stats is None:
+            return None
+
+        return {
+            "total_feedback": stats.total_feedback,
+            "per_requirement": self.stats.requirement_counts(scenario_id),
+            "coverage": self._coverage(stats.total_requirements, stats.requirements_with_feedback),
+        }
+
+    def compute_class_marking_summary(
+        self,
+        class_id: int,
+        *,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+    ) -> Page:
+        """
+        Marking summary for one page of a class's students: for each student,
+        every active scenario they own with its marking status, feedback total
+        and requirement coverage. Costs two queries per page (students, then
+        all their scenario aggregates). Pass `next_after_id` back as
+        `after_id` for the next page.
+        """
+        if self.students is None:
+            raise RuntimeError("StudentsOfClass repository is required for class summaries")
+
+        page = self.students.list_page(after_id=after_id, limit=limit, class_id=class_id)
+
+        scenarios = {membership.user_id: [] for membership in page.items}
+        rows = self.feedback.marking_rows_for_owners(scenarios)
+        for owner_id, scenario_id, title, status, total_feedback, total_requirements, covered in rows:
+            scenarios[owner_id].append({
+                "scenario_id": scenario_id,
+                "title": title,
+                "marking_status": status.value if status is not None else None,
+                "total_feedback": total_feedback,
+                "coverage": self._coverage(total_requirements, covered),
+            })
+
+        students = [
+            {"user_id": membership.user_id, "scenarios": scenarios[membership.user_id]}
+            for membership in page.items
+        ]
+        return Page(students, page.next_after_id)
+
     def set_marking_status(self, scenario_id: int, status: MarkingStatus | str):
         """
         Update the scenario's marking status. Requires a scenarios repository.
@@ -142,6 +260,29 @@ class FeedbackService:
     # ---------------------------------------------------------
     # INTERNAL HELPERS
     # ---------------------------------------------------------
+    def _create_feedback(self, payload: dict):
+        with unit_of_work(self.feedback.db):
+            feedback = self.feedback.create(**payload)
+            self._track_feedback([feedback], +1)
+        return feedback
+
+    def _track_feedback(self, feedback_rows, sign: int):
+        if self.stats is not None:
+            self.stats.feedback_changed(
+                ((f.scenario_id, f.requirement_id) for f in feedback_rows), sign
+            )
+
+    def _ensure_can_mark(self, marker_id: int, scenario_ids: set):
+        if self.scenarios is None or self.students is None:
+            raise RuntimeError("Scenarios and StudentsOfClass repositories are required to check marking rights")
+
+        owners = self.scenarios.owner_ids(scenario_ids)
+        for scenario_id in scenario_ids:
+            if scenario_id not in owners:
+                raise ValueError(f"Scenario {scenario_id} not found")
+        if not self.students.taught_by(marker_id, owners.values()):
+            raise PermissionError("Only a teacher of the scenario owners' class can add feedback")
+
     def _resolve_requirement_scenario(self, requirement_id: int, fallback_scenario_id: Optional[int]):
         if self.requirements is None:
             return fallback_scenario_id
@@ -156,17 +297,38 @@ class FeedbackService:
         if self.chat_messages is None:
             return fallback_scenario_id
 
-        message = self.chat_messages.get(chat_message_id)
-        if message is None:
-            raise ValueError(f"Chat message {chat_message_id} not found")
+        return self._resolve_message_scenarios([chat_message_id], fallback_scenario_id)[chat_message_id]
 
-        history = message.history
-        stakeholder = getattr(history, "stakeholder", None)
-        scenario = getattr(stakeholder, "scenario", None) if stakeholder else None
+    def _resolve_message_scenarios(self, chat_message_ids, fallback_scenario_id: Optional[int] = None) -> dict:
+        """
+        Map each chat message id to its scenario id with one joined query.
+        Raises ValueError for missing messages, and for messages whose scenario
+        cannot be inferred when no fallback is given.
+        """
+        resolved = self.chat_messages.scenario_ids(chat_message_ids)
+        return {
+            chat_message_id: self._message_scenario(chat_message_id, resolved, fallback_scenario_id)
+            for chat_message_id in chat_message_ids
+        }
 
-        if scenario:
-            return scenario.id
+    @staticmethod
+    def _coverage(total_requirements: int, covered: int) -> dict:
+        if not total_requirements:
+            return {"total_requirements": 0, "requirements_with_feedback": 0, "coverage_ratio": 0.0}
+        return {
+            "total_requirements": total_requirements,
+            "requirements_with_feedback": covered,
+            "coverage_ratio": covered / total_requirements,
+        }
+
+    @staticmethod
+    def _message_scenario(chat_message_id: int, resolved: dict, fallback_scenario_id: Optional[int]):
+        if chat_message_id not in resolved:
+            raise ValueError(f"Chat message {chat_message_id} not found")
 
+        scenario_id = resolved[chat_message_id]
+        if scenario_id is not None:
+            return scenario_id
         if fallback_scenario_id is None:
             raise ValueError("Unable to infer scenario_id for chat feedback")
-        return fallback_scenario_id
\ No newline at end of file
+        return fallback_scenario_id
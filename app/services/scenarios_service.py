@@ -2,16 +2,24 @@ from __future__ import annotations
 
 from typing import Iterable, Optional, Sequence
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from db.models import (
     Categories,
+    FeedbackReference,
     MarkingStatus,
     Requirements,
     ScenarioCategories,
     Scenarios,
     Stakeholder,
 )
+from db.crud.cache import invalidate
+from db.crud.cascade import cascade_restore, cascade_soft_delete
+from db.crud.soft_delete import soft_delete_where, with_deleted
+from db.unit_of_work import unit_of_work
+from db.utils import loaded_values, restore_loaded, upsert_insert
 
 
 class ScenariosService:
@@ -22,6 +30,9 @@ class ScenariosService:
     - assign stakeholders
     - manage categories
     - handle templates
+
+    `stats_repo` is the MarkingStatsRepository on the same session; every
+    requirement change adjusts the marking counters through it.
     """
 
     def __init__(
@@ -32,6 +43,7 @@ class ScenariosService:
         categories_repo,
         scenario_categories_repo,
         templates_repo,
+        stats_repo,
     ):
         self.scenarios = scenarios_repo
         self.requirements = requirements_repo
@@ -39,6 +51,7 @@ class ScenariosService:
         self.categories = categories_repo
         self.scenario_categories = scenario_categories_repo
         self.templates = templates_repo
+        self.stats = stats_repo
 
     # ---------------------------------------------------------
     # SCENARIO CRUD
@@ -55,6 +68,13 @@ class ScenariosService:
         stakeholders: Optional[Sequence[dict]] = None,
         requirements: Optional[Sequence[dict]] = None,
     ):
+        """
+        Create a scenario with its categories, stakeholders and requirements.
+        Runs as one transaction with one bulk INSERT per child table: either
+        everything is created or nothing is. Returns the scenario with its
+        `stakeholders`, `requirements` and `categories` (with `category`)
+        already populated.
+        """
         scenario_payload = {
             "owner_id": owner_id,
             "title": title,
@@ -67,31 +87,59 @@ class ScenariosService:
                 MarkingStatus(marking_status) if isinstance(marking_status, str) else marking_status
             )
 
-        scenario = self.scenarios.create(**scenario_payload)
-
-        if category_ids:
-            self.set_categories(scenario.id, category_ids)
-
-        if stakeholders:
-            for stakeholder in stakeholders:
-                self.add_stakeholder(
-                    scenario.id,
-                    name=stakeholder.get("name"),
-                    role=stakeholder.get("role"),
-                    desc=stakeholder.get("desc"),
-                    prompt=stakeholder.get("prompt"),
-                    is_senior_dev=stakeholder.get("is_senior_dev", False),
-                )
-
-        if requirements:
-            for requirement in requirements:
-                self.add_requirement(
-                    scenario.id,
-                    type=requirement.get("type"),
-                    requirement=requirement.get("requirement"),
-                    info=requirement.get("info"),
-                )
+        # Validate everything before the first write.
+        stakeholder_rows = [
+            self._stakeholder_payload(
+                None,
+                name=stakeholder.get("name"),
+                role=stakeholder.get("role"),
+                desc=stakeholder.get("desc"),
+                prompt=stakeholder.get("prompt"),
+                is_senior_dev=stakeholder.get("is_senior_dev", False),
+            )
+            for stakeholder in stakeholders or []
+        ]
+        requirement_rows = [
+            self._requirement_payload(
+                None,
+                type=requirement.get("type"),
+                requirement=requirement.get("requirement"),
+                info=requirement.get("info"),
+            )
+            for requirement in requirements or []
+        ]
+        category_ids = list(dict.fromkeys(category_ids or []))
+        categories = self.categories.get_many(category_ids) if category_ids else {}
+        for category_id in category_ids:
+            if category_id not in categories:
+                raise ValueError(f"Category {category_id} not found")
 
+        db = self._db()
+        with unit_of_work(db):
+            scenario = self.scenarios.create(**scenario_payload)
+            for row in stakeholder_rows + requirement_rows:
+                row["scenario_id"] = scenario.id
+
+            created_stakeholders = self.stakeholders.create_many(stakeholder_rows)
+            created_requirements = self.requirements.create_many(requirement_rows)
+            links = self.scenario_categories.create_many(
+                {"scenario_id": scenario.id, "category_id": category_id}
+                for category_id in category_ids
+            )
+            self.stats.scenario_created(scenario.id)
+            self._track_requirements(created_requirements, +1)
+
+            db.flush()
+            created = [scenario, *created_stakeholders, *created_requirements, *links, *categories.values()]
+            snapshots = [(obj, loaded_values(obj)) for obj in created]
+
+        # The commit expired everything; put the values we just wrote back.
+        restore_loaded(snapshots)
+        for link in links:
+            set_committed_value(link, "category", categories[link.category_id])
+        set_committed_value(scenario, "stakeholders", created_stakeholders)
+        set_committed_value(scenario, "requirements", created_requirements)
+        set_committed_value(scenario, "categories", links)
         return scenario
 
     def get_scenario(self, scenario_id: int, *, include_deleted: bool = False):
@@ -99,15 +147,43 @@ class ScenariosService:
             return self.scenarios.get(scenario_id)
 
         return (
-            self._db()
-            .query(Scenarios)
+            with_deleted(self._db().query(Scenarios))
             .filter(Scenarios.id == scenario_id)
             .first()
         )
 
+    def get_scenario_detail(self, scenario_id: int, owner_id: Optional[int] = None):
+        """
+        Load an active scenario with its active stakeholders, requirements and
+        categories in at most four queries. Returns None if the scenario does
+        not exist, is deleted, or (when `owner_id` is given) belongs to someone else.
+        """
+        # The global soft-delete filter (db/crud/soft_delete.py) keeps deleted
+        # rows out of the scenario query and every eager load.
+        stmt = (
+            select(Scenarios)
+            .where(Scenarios.id == scenario_id)
+            .options(
+                selectinload(Scenarios.stakeholders),
+                selectinload(Scenarios.requirements),
+                selectinload(Scenarios.categories).joinedload(
+                    ScenarioCategories.category, innerjoin=False
+                ),
+            )
+            # Collections loaded earlier in this transaction can still hold
+            # children soft-deleted since; reload them.
+            .execution_options(populate_existing=True)
+        )
+        if owner_id is not None:
+            stmt = stmt.where(Scenarios.owner_id == owner_id)
+
+        return self._db().scalars(stmt).first()
+
     def list_scenarios(self, *, owner_id: Optional[int] = None, include_deleted: bool = False):
         query = self._db().query(Scenarios)
-        if not include_deleted:
+        if include_deleted:
+            query = with_deleted(query)
+        else:
             query = query.filter(Scenarios.deleted_at.is_(None))
         if owner_id is not None:
             query = query.filter(Scenarios.owner_id == owner_id)
@@ -135,17 +211,34 @@ class ScenariosService:
         return scenario
 
     def delete_scenario(self, scenario_id: int):
-        return self.scenarios.delete(scenario_id)
+        """
+        Soft delete a scenario together with its stakeholders, chats,
+        requirements, category links and feedback (one UPDATE per table).
+        """
+        with unit_of_work(self._db()):
+            counts = cascade_soft_delete(self._db(), Scenarios, [scenario_id])
+            if not counts.get(Scenarios.__tablename__):
+                return None
+            self._recompute_stats(scenario_id)
+        return self.get_scenario(scenario_id, include_deleted=True)
 
     def restore_scenario(self, scenario_id: int):
-        return self.scenarios.restore(scenario_id)
+        """Restore a scenario and everything that was deleted along with it."""
+        with unit_of_work(self._db()):
+            counts = cascade_restore(self._db(), Scenarios, [scenario_id])
+            if not counts.get(Scenarios.__tablename__):
+                return None
+            self._recompute_stats(scenario_id)
+        return self.get_scenario(scenario_id)
 
     # ---------------------------------------------------------
     # REQUIREMENTS
     # ---------------------------------------------------------
     def list_requirements(self, scenario_id: int, *, include_deleted: bool = False):
         query = self._db().query(Requirements).filter(Requirements.scenario_id == scenario_id)
-        if not include_deleted:
+        if include_deleted:
+            query = with_deleted(query)
+        else:
             query = query.filter(Requirements.deleted_at.is_(None))
         return query.all()
 
@@ -157,19 +250,11 @@ class ScenariosService:
         requirement: Optional[str] = None,
         info: Optional[str] = None,
     ):
-        if not type:
-            raise ValueError("Requirement type is required")
-
-        text = requirement if requirement is not None else info
-        if text is None:
-            raise ValueError("Requirement text is required")
-
-        payload = {
-            "scenario_id": scenario_id,
-            "type": type,
-            "requirement": text,
-        }
-        return self.requirements.create(**payload)
+        payload = self._requirement_payload(scenario_id, type=type, requirement=requirement, info=info)
+        with unit_of_work(self._db()):
+            created = self.requirements.create(**payload)
+            self._track_requirements([created], +1)
+        return created
 
     def update_requirement(self, requirement_id: int, data: dict):
         payload = data.copy()
@@ -178,23 +263,56 @@ class ScenariosService:
         return self.requirements.update(requirement_id, **payload)
 
     def delete_requirement(self, requirement_id: int):
-        return self.requirements.delete(requirement_id)
+        with unit_of_work(self._db()):
+            requirement = self.requirements.delete(requirement_id)
+            if requirement is not None:
+                self._track_requirements([requirement], -1)
+        return requirement
 
     def restore_requirement(self, requirement_id: int):
-        return self.requirements.restore(requirement_id)
+        with unit_of_work(self._db()):
+            requirement = self.requirements.restore(requirement_id)
+            if requirement is not None:
+                self._track_requirements([requirement], +1)
+        return requirement
 
     def clear_requirements(self, scenario_id: int):
-        requirements = self.list_requirements(scenario_id)
-        for req in requirements:
-            self.requirements.delete(req.id)
-        return len(requirements)
+        """Soft delete every active requirement of a scenario with one UPDATE."""
+        with unit_of_work(self._db()):
+            ids = soft_delete_where(self._db(), Requirements, scenario_id=scenario_id)
+            self.stats.requirements_changed(((scenario_id, id) for id in ids), -1)
+        return len(ids)
+
+    def sync_requirements(self, scenario_id: int, items: Sequence[dict]):
+        """
+        Make the scenario's active requirements match `items`: items with an
+        `id` update that requirement, items without one are created and
+        requirements left out are soft deleted. Returns the active requirements.
+        """
+        def payload(item):
+            return self._requirement_payload(
+                scenario_id,
+                type=item.get("type"),
+                requirement=item.get("requirement"),
+                info=item.get("info"),
+            )
+
+        with unit_of_work(self._db()):
+            rows, created, deleted = self._sync_children(
+                Requirements, self.requirements, scenario_id, items, payload
+            )
+            self._track_requirements(created, +1)
+            self._track_requirements(deleted, -1)
+        return rows
 
     # ---------------------------------------------------------
     # STAKEHOLDERS
     # ---------------------------------------------------------
     def list_stakeholders(self, scenario_id: int, *, include_deleted: bool = False):
         query = self._db().query(Stakeholder).filter(Stakeholder.scenario_id == scenario_id)
-        if not include_deleted:
+        if include_deleted:
+            query = with_deleted(query)
+        else:
             query = query.filter(Stakeholder.deleted_at.is_(None))
         return query.all()
 
@@ -208,17 +326,9 @@ class ScenariosService:
         prompt: Optional[str] = None,
         is_senior_dev: bool = False,
     ):
-        if not name or not role:
-            raise ValueError("Stakeholder name and role are required")
-
-        payload = {
-            "scenario_id": scenario_id,
-            "name": name,
-            "role": role,
-            "desc": desc,
-            "prompt": prompt or desc or "",
-            "is_senior_dev": is_senior_dev,
-        }
+        payload = self._stakeholder_payload(
+            scenario_id, name=name, role=role, desc=desc, prompt=prompt, is_senior_dev=is_senior_dev
+        )
         return self.stakeholders.create(**payload)
 
     def update_stakeholder(self, stakeholder_id: int, data: dict):
@@ -227,6 +337,36 @@ class ScenariosService:
             payload["prompt"] = payload["desc"]
         return self.stakeholders.update(stakeholder_id, **payload)
 
+    def sync_stakeholders(self, scenario_id: int, items: Sequence[dict]):
+        """
+        Make the scenario's active stakeholders match `items`: items with an
+        `id` update that stakeholder, items without one are created and
+        stakeholders left out are soft deleted together with their chat
+        histories, messages and feedback. Stakeholders that are kept keep
+        their ids, so their chat histories are untouched.
+        Returns the active stakeholders.
+        """
+        def payload(item):
+            return self._stakeholder_payload(
+                scenario_id,
+                name=item.get("name"),
+                role=item.get("role"),
+                desc=item.get("desc"),
+                prompt=item.get("prompt"),
+                is_senior_dev=item.get("is_senior_dev", False),
+            )
+
+        def delete(ids):
+            counts = cascade_soft_delete(self._db(), Stakeholder, ids)
+            if counts.get(FeedbackReference.__tablename__):
+                self._recompute_stats(scenario_id)
+            return counts
+
+        rows, _, _ = self._sync_children(
+            Stakeholder, self.stakeholders, scenario_id, items, payload, delete=delete
+        )
+        return rows
+
     def delete_stakeholder(self, stakeholder_id: int):
         return self.stakeholders.delete(stakeholder_id)
 
@@ -238,7 +378,9 @@ class ScenariosService:
     # ---------------------------------------------------------
     def list_categories(self, *, include_deleted: bool = False):
         query = self._db().query(Categories)
-        if not include_deleted:
+        if include_deleted:
+            query = with_deleted(query)
+        else:
             query = query.filter(Categories.deleted_at.is_(None))
         return query.all()
 
@@ -257,43 +399,48 @@ class ScenariosService:
     def set_categories(self, scenario_id: int, category_ids: Iterable[int]):
         """
         Replace scenario categories with the provided list of IDs.
-        Restores soft-deleted links where possible instead of recreating them.
+        One upsert inserts new links and restores soft-deleted ones, and one
+        UPDATE soft-deletes the links no longer wanted.
         """
-        desired_ids = set(category_ids or [])
-        db = self._db()
-
-        links = (
-            db.query(ScenarioCategories)
-            .filter(ScenarioCategories.scenario_id == scenario_id)
-            .all()
-        )
-
-        active_links = {link.category_id: link for link in links if link.deleted_at is None}
-        deleted_links = {link.category_id: link for link in links if link.deleted_at is not None}
-
+        desired_ids = list(dict.fromkeys(category_ids or []))
+        found = self.categories.get_many(desired_ids) if desired_ids else {}
         for category_id in desired_ids:
-            if category_id in active_links:
-                continue
-
-            if category_id in deleted_links:
-                link = deleted_links[category_id]
-                link.deleted_at = None
-                db.add(link)
-                db.commit()
-                db.refresh(link)
-                continue
-
-            category = self.categories.get(category_id)
-            if not category:
+            if category_id not in found:
                 raise ValueError(f"Category {category_id} not found")
 
-            self.scenario_categories.create(scenario_id=scenario_id, category_id=category_id)
-
-        for category_id, link in active_links.items():
-            if category_id not in desired_ids:
-                self.scenario_categories.delete(link.id)
+        db = self._db()
+        with unit_of_work(db):
+            if desired_ids:
+                stmt = upsert_insert(db, ScenarioCategories).values(
+                    [
+                        {"scenario_id": scenario_id, "category_id": category_id}
+                        for category_id in desired_ids
+                    ]
+                )
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[
+                            ScenarioCategories.scenario_id,
+                            ScenarioCategories.category_id,
+                        ],
+                        set_={"deleted_at": None},
+                        where=ScenarioCategories.deleted_at.is_not(None),
+                    )
+                )
+            soft_delete_where(
+                db,
+                ScenarioCategories,
+                ScenarioCategories.category_id.not_in(desired_ids),
+                scenario_id=scenario_id,
+            )
 
-        return self.scenario_categories.list(scenario_id=scenario_id)
+        stmt = (
+            select(ScenarioCategories)
+            .filter_by(scenario_id=scenario_id)
+            .order_by(ScenarioCategories.id)
+            .execution_options(populate_existing=True)
+        )
+        return db.scalars(stmt).all()
 
     def add_category_to_scenario(self, scenario_id: int, category_id: int):
         links = self.scenario_categories.list(scenario_id=scenario_id)
@@ -331,4 +478,84 @@ class ScenariosService:
     # INTERNAL HELPERS
     # ---------------------------------------------------------
     def _db(self) -> Session:
-        return self.scenarios.db
\ No newline at end of file
+        return self.scenarios.db
+
+    @staticmethod
+    def _requirement_payload(scenario_id, *, type, requirement=None, info=None) -> dict:
+        if not type:
+            raise ValueError("Requirement type is required")
+
+        text = requirement if requirement is not None else info
+        if text is None:
+            raise ValueError("Requirement text is required")
+
+        return {
+            "scenario_id": scenario_id,
+            "type": type,
+            "requirement": text,
+        }
+
+    @staticmethod
+    def _stakeholder_payload(scenario_id, *, name, role, desc=None, prompt=None, is_senior_dev=False) -> dict:
+        if not name or not role:
+            raise ValueError("Stakeholder name and role are required")
+
+        return {
+            "scenario_id": scenario_id,
+            "name": name,
+            "role": role,
+            "desc": desc,
+            "prompt": prompt or desc or "",
+            "is_senior_dev": is_senior_dev,
+        }
+
+    def _sync_children(self, model, repo, scenario_id: int, items, payload, *, delete=None) -> tuple:
+        """
+        Diff `items` against the scenario's active `model` rows and apply the
+        difference with one bulk statement per kind of change: an INSERT for
+        new rows, an UPDATE by primary key for changed rows and one soft
+        delete UPDATE for removed rows (or `delete(ids)`, in the same
+        transaction). Unchanged rows are not written.
+        Returns (active rows, created rows, what the delete returned).
+        """
+        db = self._db()
+        current = {row.id: row for row in repo.list(scenario_id=scenario_id)}
+
+        # Validate everything before the first write.
+        inserts, updates, kept = [], [], set()
+        for item in items:
+            values = payload(item)
+            id = item.get("id")
+            if id is None:
+                inserts.append(values)
+                continue
+
+            row = current.get(id)
+            if row is None or id in kept:
+                raise ValueError(f"{model.__name__} {id} not found in scenario {scenario_id}")
+            kept.add(id)
+
+            changed = {key: value for key, value in values.items() if getattr(row, key) != value}
+            if changed:
+                updates.append({"id": id, **changed})
+
+        with unit_of_work(db):
+            if updates:
+                db.execute(update(model), updates)
+                invalidate(db, model, [values["id"] for values in updates])
+            created = repo.create_many(inserts)
+            deleted = (delete or repo.delete_many)([id for id in current if id not in kept])
+
+        stmt = (
+            select(model)
+            .filter_by(scenario_id=scenario_id)
+            .order_by(model.id)
+            .execution_options(populate_existing=True)
+        )
+        return db.scalars(stmt).all(), created, deleted
+
+    def _track_requirements(self, requirements, sign: int):
+        self.stats.requirements_changed(((r.scenario_id, r.id) for r in requirements), sign)
+
+    def _recompute_stats(self, scenario_id: int):
+        self.stats.recompute([scenario_id])
\ No newline at end of file
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta, timezone
 
+from db.unit_of_work import commit_or_flush
+
 
 class UsersService:
     """
@@ -124,8 +126,8 @@ class UsersService:
             new_expiry = base + timedelta(days=days)
 
         user.subscription_expires_at = new_expiry
-        self.users.db.commit()
-        self.users.db.refresh(user)
+        if commit_or_flush(self.users.db):
+            self.users.db.refresh(user)
         return user
 
     def expire_subscription(self, user_id: int):
@@ -135,6 +137,6 @@ class UsersService:
             return None
 
         user.subscription_expires_at = datetime.now(timezone.utc)
-        self.users.db.commit()
-        self.users.db.refresh(user)
+        if commit_or_flush(self.users.db):
+            self.users.db.refresh(user)
         return user
\ No newline at end of file
@@ -0,0 +1,250 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud.base_repository import Page, RepositoryStatements
+from db.crud.cache import can_populate, get_cache, invalidate
+from db.crud.soft_delete import with_deleted
+from db.unit_of_work import async_commit_or_flush
+
+
+class AsyncBaseRepository(RepositoryStatements):
+    """
+    AsyncSession counterpart of BaseRepository with the same method names
+    and semantics; every method is a coroutine (iter_batches is an async
+    generator). Subclasses must set `model` to a SQLAlchemy model class.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # -----------------------------
+    # GET (active only)
+    # -----------------------------
+    async def get(self, id: int):
+        cache = get_cache(self.model)
+        if cache is not None:
+            values = cache.get(id)
+            if values is not None:
+                return await self._from_cache(id, values)
+
+        obj = (await self.db.scalars(self._get_select(id))).first()
+        if cache is not None and obj is not None and can_populate(self.db):
+            cache.set(id, self._loaded_values(obj))
+        return obj
+
+    # -----------------------------
+    # GET MANY (active only)
+    # -----------------------------
+    async def get_many(self, ids: Iterable[int]) -> dict:
+        ids = list(dict.fromkeys(ids))
+        cache = get_cache(self.model)
+        found = {}
+        missing = []
+        for id in ids:
+            values = cache.get(id) if cache is not None else None
+            if values is None:
+                missing.append(id)
+                continue
+            obj = await self._from_cache(id, values)
+            if obj is not None:
+                found[id] = obj
+
+        populate = cache is not None and can_populate(self.db)
+        for stmt in self._get_many_selects(missing):
+            for obj in await self.db.scalars(stmt):
+                found[obj.id] = obj
+                if populate:
+                    cache.set(obj.id, self._loaded_values(obj))
+
+        return found
+
+    # -----------------------------
+    # LIST (active only)
+    # -----------------------------
+    async def list(self, **filters):
+        return (await self.db.scalars(self._active_select(**filters))).all()
+
+    # -----------------------------
+    # LIST PAGE (active only, keyset)
+    # -----------------------------
+    async def list_page(
+        self,
+        *,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        order: str = "asc",
+        **filters,
+    ) -> Page:
+        stmt = self._page_select(after_id, limit, order, **filters)
+        return self._to_page((await self.db.scalars(stmt)).all(), limit)
+
+    # -----------------------------
+    # ITERATE IN BATCHES (active only)
+    # -----------------------------
+    async def iter_batches(self, batch_size: int = 500, **filters):
+        result = await self.db.stream_scalars(self._batches_select(batch_size, **filters))
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    # -----------------------------
+    # CREATE
+    # -----------------------------
+    async def create(self, **data):
+        obj = self.model(**data)
+        self.db.add(obj)
+        await self._commit(obj)
+        return obj
+
+    # -----------------------------
+    # UPDATE
+    # -----------------------------
+    async def update(self, id: int, **data):
+        if not data:
+            return await self.get(id)
+
+        obj = await self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_(None), self._changed(data)),
+            data,
+        )
+        if obj is None:
+            # Either the row is missing/deleted or nothing changed.
+            return await self.get(id)
+        return obj
+
+    # -----------------------------
+    # SOFT DELETE
+    # -----------------------------
+    async def delete(self, id: int):
+        return await self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_(None)),
+            {"deleted_at": datetime.now(timezone.utc)},
+        )
+
+    # -----------------------------
+    # RESTORE
+    # -----------------------------
+    async def restore(self, id: int):
+        return await self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_not(None)),
+            {"deleted_at": None},
+        )
+
+    # -----------------------------
+    # BULK CREATE
+    # -----------------------------
+    async def create_many(self, rows: Iterable[dict]):
+        rows = [dict(row) for row in rows]
+        if not rows:
+            return []
+
+        if self._dialect().insert_executemany_returning:
+            ids = (await self.db.scalars(self._insert_ids_stmt(), rows)).all()
+        else:
+            objs = [self.model(**row) for row in rows]
+            self.db.add_all(objs)
+            await self.db.flush()
+            ids = [obj.id for obj in objs]
+
+        await self._commit()
+        return await self._load_ordered(ids)
+
+    # -----------------------------
+    # BULK UPDATE
+    # -----------------------------
+    async def update_many(self, ids: Iterable[int], **data):
+        ids = list(ids)
+        if not ids or not data:
+            return await self._load_ordered(ids)
+
+        updated_ids = await self._bulk_update(
+            (self.model.id.in_(ids), self.model.deleted_at.is_(None)),
+            data,
+        )
+        await self._commit()
+        return await self._load_ordered(updated_ids)
+
+    # -----------------------------
+    # BULK SOFT DELETE
+    # -----------------------------
+    async def delete_many(self, ids: Iterable[int]):
+        ids = list(ids)
+        if not ids:
+            return []
+
+        deleted_ids = await self._bulk_update(
+            (self.model.id.in_(ids), self.model.deleted_at.is_(None)),
+            {"deleted_at": datetime.now(timezone.utc)},
+        )
+        await self._commit()
+        return await self._load_ordered(deleted_ids, include_deleted=True)
+
+    # -----------------------------
+    # GET ALL (active + deleted)
+    # -----------------------------
+    async def all(self, **filters):
+        return (await self.db.scalars(self._all_select(**filters))).all()
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    async def _commit(self, *keep):
+        await self.db.flush()
+        snapshots = [(obj, self._loaded_values(obj)) for obj in keep]
+        if await async_commit_or_flush(self.db):
+            self._restore_loaded(snapshots)
+
+    async def _update_one(self, criteria, values: dict):
+        await self.db.flush()
+        if self._dialect().update_returning:
+            stmt = self._update_one_stmt(criteria, values)
+            result = await self.db.scalars(stmt, execution_options={"populate_existing": True})
+            obj = result.first()
+        else:
+            obj = (await self.db.scalars(with_deleted(select(self.model).where(*criteria)))).first()
+            if obj is not None:
+                for key, value in values.items():
+                    setattr(obj, key, value)
+
+        if obj is None:
+            return None
+
+        invalidate(self.db, self.model, [obj.id])
+        await self._commit(obj)
+        return obj
+
+    async def _from_cache(self, id: int, values: dict):
+        existing = self.db.identity_map.get(self._identity_key(id))
+        if existing is not None:
+            return existing if existing.deleted_at is None else None
+
+        return await self.db.merge(self._detached(values), load=False)
+
+    def _dialect(self):
+        return self.db.get_bind().dialect
+
+    async def _bulk_update(self, criteria, values: dict):
+        stmt = update(self.model).where(*criteria).values(**values)
+        if self._dialect().update_returning:
+            ids = (await self.db.scalars(stmt.returning(self.model.id))).all()
+        else:
+            ids = (await self.db.scalars(with_deleted(select(self.model.id).where(*criteria)))).all()
+            if ids:
+                await self.db.execute(
+                    update(self.model).where(self.model.id.in_(ids)).values(**values)
+                )
+
+        invalidate(self.db, self.model, ids)
+        return ids
+
+    async def _load_ordered(self, ids, *, include_deleted: bool = False):
+        ids = list(ids)
+        rows = []
+        for stmt in self._load_selects(ids, include_deleted=include_deleted):
+            rows.extend(await self.db.scalars(stmt))
+        return self._in_order(rows, ids)
@@ -1,14 +1,139 @@
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from typing import Iterable, NamedTuple, Optional
 
-class BaseRepository:
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from db.crud.cache import can_populate, get_cache, invalidate
+from db.crud.soft_delete import with_deleted
+from db.unit_of_work import commit_or_flush
+from db.utils import loaded_values, restore_loaded, update_returning_ids
+
+# Upper bound on ids per IN (...) clause.
+IN_CHUNK_SIZE = 500
+
+
+class Page(NamedTuple):
+    """One keyset page: the rows plus the cursor for the next page (None when exhausted)."""
+    items: list
+    next_after_id: Optional[int]
+
+
+class RepositoryStatements:
     """
-    Generic repository providing CRUD + soft delete operations.
-    Subclasses must set `model` to a SQLAlchemy model class.
+    Statement builders shared by BaseRepository and AsyncBaseRepository.
+    Nothing here performs I/O.
     """
 
     model = None  # override in subclasses
 
+    def _get_select(self, id: int):
+        return select(self.model).where(self.model.id == id, self.model.deleted_at.is_(None))
+
+    def _active_select(self, **filters):
+        return (
+            select(self.model)
+            .where(self.model.deleted_at.is_(None))
+            .filter_by(**filters)
+        )
+
+    def _get_many_selects(self, ids: list):
+        """One active-rows SELECT per IN_CHUNK_SIZE ids."""
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            yield select(self.model).where(
+                self.model.id.in_(chunk), self.model.deleted_at.is_(None)
+            )
+
+    def _page_select(self, after_id: Optional[int], limit: int, order: str, **filters):
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+        stmt = self._active_select(**filters)
+        if order == "asc":
+            if after_id is not None:
+                stmt = stmt.where(self.model.id > after_id)
+            stmt = stmt.order_by(self.model.id.asc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(self.model.id < after_id)
+            stmt = stmt.order_by(self.model.id.desc())
+
+        # Fetch one extra row to know whether another page exists.
+        return stmt.limit(limit + 1)
+
+    @staticmethod
+    def _to_page(rows, limit: int) -> Page:
+        items = list(rows[:limit])
+        next_after_id = items[-1].id if len(rows) > limit else None
+        return Page(items, next_after_id)
+
+    def _batches_select(self, batch_size: int, **filters):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        stmt = self._active_select(**filters).order_by(self.model.id)
+        return stmt.execution_options(yield_per=batch_size)
+
+    def _changed(self, data: dict):
+        """True for rows where at least one of `data` differs from the stored value."""
+        return or_(
+            *(getattr(self.model, key).is_distinct_from(value) for key, value in data.items())
+        )
+
+    def _update_one_stmt(self, criteria, values: dict):
+        return update(self.model).where(*criteria).values(**values).returning(self.model)
+
+    def _insert_ids_stmt(self):
+        return insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+
+    def _load_selects(self, ids: list, *, include_deleted: bool = False):
+        """One SELECT per IN_CHUNK_SIZE ids, refreshing rows already in the session."""
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            stmt = select(self.model).where(self.model.id.in_(ids[start:start + IN_CHUNK_SIZE]))
+            if include_deleted:
+                stmt = with_deleted(stmt)
+            else:
+                stmt = stmt.where(self.model.deleted_at.is_(None))
+            yield stmt.execution_options(populate_existing=True)
+
+    @staticmethod
+    def _in_order(rows, ids) -> list:
+        by_id = {row.id: row for row in rows}
+        return [by_id[id] for id in ids if id in by_id]
+
+    def _all_select(self, **filters):
+        return with_deleted(select(self.model).filter_by(**filters))
+
+    def _loaded_values(self, obj) -> dict:
+        return loaded_values(obj)
+
+    @staticmethod
+    def _restore_loaded(snapshots):
+        """Re-apply pre-commit column values so objects need no refresh SELECT."""
+        restore_loaded(snapshots)
+
+    def _detached(self, values: dict):
+        obj = self.model(**values)
+        make_transient_to_detached(obj)
+        return obj
+
+    def _identity_key(self, id: int):
+        return identity_key(self.model, id)
+
+
+class BaseRepository(RepositoryStatements):
+    """
+    Generic repository providing CRUD + soft delete operations.
+    Subclasses must set `model` to a SQLAlchemy model class.
+
+    Writes commit immediately, or only flush when the session is inside
+    `db.unit_of_work.unit_of_work()`.
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -16,22 +141,86 @@ class BaseRepository:
     # GET (active only)
     # -----------------------------
     def get(self, id: int):
-        return (
-            self.db.query(self.model)
-            .filter(self.model.id == id, self.model.deleted_at.is_(None))
-            .first()
-        )
+        cache = get_cache(self.model)
+        if cache is not None:
+            values = cache.get(id)
+            if values is not None:
+                return self._from_cache(id, values)
+
+        obj = self.db.scalars(self._get_select(id)).first()
+        if cache is not None and obj is not None and can_populate(self.db):
+            cache.set(id, self._loaded_values(obj))
+        return obj
+
+    # -----------------------------
+    # GET MANY (active only)
+    # -----------------------------
+    def get_many(self, ids: Iterable[int]) -> dict:
+        """
+        Return {id: obj} for the active rows among `ids`.
+        Uses one IN (...) query per IN_CHUNK_SIZE ids; missing ids are omitted.
+        """
+        ids = list(dict.fromkeys(ids))
+        cache = get_cache(self.model)
+        found = {}
+        missing = []
+        for id in ids:
+            values = cache.get(id) if cache is not None else None
+            if values is None:
+                missing.append(id)
+                continue
+            obj = self._from_cache(id, values)
+            if obj is not None:
+                found[id] = obj
+
+        populate = cache is not None and can_populate(self.db)
+        for stmt in self._get_many_selects(missing):
+            for obj in self.db.scalars(stmt):
+                found[obj.id] = obj
+                if populate:
+                    cache.set(obj.id, self._loaded_values(obj))
+
+        return found
 
     # -----------------------------
     # LIST (active only)
     # -----------------------------
     def list(self, **filters):
-        return (
-            self.db.query(self.model)
-            .filter(self.model.deleted_at.is_(None))
-            .filter_by(**filters)
-            .all()
-        )
+        return self.db.scalars(self._active_select(**filters)).all()
+
+    # -----------------------------
+    # LIST PAGE (active only, keyset)
+    # -----------------------------
+    def list_page(
+        self,
+        *,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        order: str = "asc",
+        **filters,
+    ) -> Page:
+        """
+        Return up to `limit` active rows ordered by id, starting after `after_id`.
+        Pass `page.next_after_id` back as `after_id` to fetch the next page.
+        """
+        stmt = self._page_select(after_id, limit, order, **filters)
+        return self._to_page(self.db.scalars(stmt).all(), limit)
+
+    # -----------------------------
+    # ITERATE IN BATCHES (active only)
+    # -----------------------------
+    def iter_batches(self, batch_size: int = 500, **filters):
+        """
+        Yield active rows in id order as lists of at most `batch_size`.
+        Rows are streamed with yield_per, so memory stays bounded by the
+        batch size rather than the table size.
+        """
+        result = self.db.scalars(self._batches_select(batch_size, **filters))
+        try:
+            for batch in result.partitions():
+                yield batch
+        finally:
+            result.close()
 
     # -----------------------------
     # CREATE
@@ -39,55 +228,176 @@ class BaseRepository:
     def create(self, **data):
         obj = self.model(**data)
         self.db.add(obj)
-        self.db.commit()
-        self.db.refresh(obj)
+        self._commit(obj)
         return obj
 
     # -----------------------------
     # UPDATE
     # -----------------------------
     def update(self, id: int, **data):
-        obj = self.get(id)
-        if not obj:
-            return None
-
-        for key, value in data.items():
-            setattr(obj, key, value)
+        """
+        Update an active row with a single UPDATE ... RETURNING.
+        Writes nothing when every value already matches the stored row.
+        """
+        if not data:
+            return self.get(id)
 
-        self.db.commit()
-        self.db.refresh(obj)
+        obj = self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_(None), self._changed(data)),
+            data,
+        )
+        if obj is None:
+            # Either the row is missing/deleted or nothing changed.
+            return self.get(id)
         return obj
 
     # -----------------------------
     # SOFT DELETE
     # -----------------------------
     def delete(self, id: int):
-        obj = self.get(id)
-        if not obj:
-            return None
-
-        obj.deleted_at = datetime.now(timezone.utc)
-        self.db.commit()
-        return obj
+        return self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_(None)),
+            {"deleted_at": datetime.now(timezone.utc)},
+        )
 
     # -----------------------------
     # RESTORE
     # -----------------------------
     def restore(self, id: int):
-        obj = (
-            self.db.query(self.model)
-            .filter(self.model.id == id, self.model.deleted_at.is_not(None))
-            .first()
+        return self._update_one(
+            (self.model.id == id, self.model.deleted_at.is_not(None)),
+            {"deleted_at": None},
         )
-        if not obj:
-            return None
 
-        obj.deleted_at = None
-        self.db.commit()
-        return obj
+    # -----------------------------
+    # BULK CREATE
+    # -----------------------------
+    def create_many(self, rows: Iterable[dict]):
+        """
+        Insert many rows and commit once. Returns the created objects in
+        input order. PostgreSQL batches the rows into multi-row INSERTs;
+        SQLite cannot order RETURNING rows without a sentinel column, so
+        there SQLAlchemy sends one INSERT per row.
+        """
+        rows = [dict(row) for row in rows]
+        if not rows:
+            return []
+
+        if self._dialect().insert_executemany_returning:
+            ids = self.db.scalars(self._insert_ids_stmt(), rows).all()
+        else:
+            objs = [self.model(**row) for row in rows]
+            self.db.add_all(objs)
+            self.db.flush()
+            ids = [obj.id for obj in objs]
+
+        self._commit()
+        return self._load_ordered(ids)
+
+    # -----------------------------
+    # BULK UPDATE
+    # -----------------------------
+    def update_many(self, ids: Iterable[int], **data):
+        """
+        Apply the same field values to many active rows with a single UPDATE.
+        Returns the updated objects; missing or deleted ids are skipped.
+        """
+        ids = list(ids)
+        if not ids or not data:
+            return self._load_ordered(ids)
+
+        updated_ids = self._bulk_update(
+            (self.model.id.in_(ids), self.model.deleted_at.is_(None)),
+            data,
+        )
+        self._commit()
+        return self._load_ordered(updated_ids)
+
+    # -----------------------------
+    # BULK SOFT DELETE
+    # -----------------------------
+    def delete_many(self, ids: Iterable[int]):
+        """
+        Soft delete many active rows with a single UPDATE.
+        Returns the deleted objects; missing or already deleted ids are skipped.
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+
+        deleted_ids = self._bulk_update(
+            (self.model.id.in_(ids), self.model.deleted_at.is_(None)),
+            {"deleted_at": datetime.now(timezone.utc)},
+        )
+        self._commit()
+        return self._load_ordered(deleted_ids, include_deleted=True)
 
     # -----------------------------
     # GET ALL (active + deleted)
     # -----------------------------
     def all(self, **filters):
-        return self.db.query(self.model).filter_by(**filters).all()
\ No newline at end of file
+        return self.db.scalars(self._all_select(**filters)).all()
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _commit(self, *keep):
+        """
+        Commit (or flush inside a unit of work).
+        Objects in `keep` stay loaded after the commit instead of being
+        expired and re-selected on next access.
+        """
+        self.db.flush()
+        snapshots = [(obj, self._loaded_values(obj)) for obj in keep]
+        if commit_or_flush(self.db):
+            self._restore_loaded(snapshots)
+
+    def _update_one(self, criteria, values: dict):
+        """
+        Update at most one row matching `criteria` and return it, or None.
+        Uses a single UPDATE ... RETURNING where the dialect supports it
+        (PostgreSQL, SQLite >= 3.35), otherwise SELECT then UPDATE.
+        """
+        # Write pending changes first; populate_existing would discard them.
+        self.db.flush()
+        if self._dialect().update_returning:
+            stmt = self._update_one_stmt(criteria, values)
+            obj = self.db.scalars(stmt, execution_options={"populate_existing": True}).first()
+        else:
+            obj = self.db.scalars(with_deleted(select(self.model).where(*criteria))).first()
+            if obj is not None:
+                for key, value in values.items():
+                    setattr(obj, key, value)
+
+        if obj is None:
+            return None
+
+        invalidate(self.db, self.model, [obj.id])
+        self._commit(obj)
+        return obj
+
+    def _from_cache(self, id: int, values: dict):
+        """Attach a cached row to this session without emitting a SELECT."""
+        existing = self.db.identity_map.get(self._identity_key(id))
+        if existing is not None:
+            # The session's own copy wins; it may hold unflushed changes.
+            return existing if existing.deleted_at is None else None
+
+        return self.db.merge(self._detached(values), load=False)
+
+    def _dialect(self):
+        return self.db.get_bind().dialect
+
+    def _bulk_update(self, criteria, values: dict):
+        """Run one UPDATE over `criteria` and return the ids it touched."""
+        ids = update_returning_ids(self.db, self.model, criteria, values)
+        invalidate(self.db, self.model, ids)
+        return ids
+
+    def _load_ordered(self, ids, *, include_deleted: bool = False):
+        """Load rows for `ids`, one SELECT per IN_CHUNK_SIZE ids, in the order of `ids`."""
+        ids = list(ids)
+        rows = []
+        for stmt in self._load_selects(ids, include_deleted=include_deleted):
+            rows.extend(self.db.scalars(stmt))
+        return self._in_order(rows, ids)
@@ -0,0 +1,170 @@
+"""
+Opt-in read-through cache for BaseRepository.get.
+
+Each enabled model gets its own LRU + TTL cache of active rows keyed by
+primary key. Entries hold plain column values, not ORM objects, so a hit is
+merged into the caller's session without a SELECT. Writes through the
+repositories, the soft_delete helpers and ORM flushes invalidate entries;
+the TTL bounds staleness from writes made by other processes.
+
+Entries are only ever filled from committed primary reads: a session with
+pending or uncommitted writes, or one reading from a replica, never
+populates the cache (see can_populate).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db.routing import is_sticky, reads_from_replica
+from db.unit_of_work import in_unit_of_work
+
+_PENDING_KEY = "cache_pending_invalidations"
+
+
+class ModelCache:
+    """Thread-safe LRU + TTL mapping of primary key -> column values."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, values = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def set(self, key, values: dict):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, dict(values))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# ---------------------------------------------------------
+# Registry (model -> cache)
+# ---------------------------------------------------------
+_caches: dict = {}
+
+
+def enable_cache(model, *, maxsize: int = 1024, ttl: float = 30.0) -> ModelCache:
+    """Turn on caching for `model`; returns its cache."""
+    cache = ModelCache(maxsize=maxsize, ttl=ttl)
+    _caches[model] = cache
+    return cache
+
+
+def disable_cache(model):
+    _caches.pop(model, None)
+
+
+def get_cache(model) -> Optional[ModelCache]:
+    return _caches.get(model)
+
+
+def clear_caches():
+    for cache in _caches.values():
+        cache.clear()
+
+
+def cache_stats() -> dict:
+    return {model.__tablename__: cache.stats() for model, cache in _caches.items()}
+
+
+def invalidate(db: Session, model, ids: Iterable[int]):
+    """
+    Drop cached rows for `ids` now and again when the session's transaction
+    ends, so a concurrent reader cannot re-cache the pre-commit value.
+    """
+    cache = get_cache(model)
+    if cache is None:
+        return
+
+    ids = list(ids)
+    cache.invalidate(ids)
+    db.info.setdefault(_PENDING_KEY, set()).update((model, id) for id in ids)
+
+
+def can_populate(db: Session) -> bool:
+    """
+    True when rows read through `db` may be stored in a cache. Rows read
+    inside a transaction with writes of its own may never be committed, and
+    replica reads may predate an invalidation; both are kept out. Sessions
+    pinned to the primary have written, so they are kept out too.
+    """
+    if in_unit_of_work(db) or db.new or db.dirty or db.deleted:
+        return False
+    if db.info.get(_PENDING_KEY):
+        return False
+    return not (is_sticky(db) or reads_from_replica(db))
+
+
+# ---------------------------------------------------------
+# Session hooks
+# ---------------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session, flush_context):
+    if not _caches:
+        return
+
+    # New rows are included: until commit they may still be rolled back.
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        model = type(obj)
+        if model in _caches and getattr(obj, "id", None) is not None:
+            invalidate(session, model, [obj.id])
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    for model, id in pending:
+        cache = get_cache(model)
+        if cache is not None:
+            cache.invalidate([id])
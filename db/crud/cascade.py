@@ -0,0 +1,150 @@
+"""
+Set-based cascade soft delete / restore over the model graph.
+
+Starting from a root model, every one-to-many relationship whose target is
+soft-deletable is followed (e.g. scenario -> stakeholders -> chat_history ->
+chat_message -> feedback_reference). Each reachable table is updated with a
+single UPDATE whose WHERE clause selects children through id subqueries, so
+the statement count depends on the shape of the graph, not on the number of
+rows.
+
+All rows touched by one cascade share the root's deleted_at timestamp.
+Restoring matches on that timestamp, so children that were deleted on their
+own before the cascade stay deleted.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import inspect, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ONETOMANY
+
+from db.crud.cache import get_cache, invalidate
+from db.crud.soft_delete import with_deleted
+from db.models import SoftDeleteMixin
+from db.routing import stick_to_primary
+from db.unit_of_work import commit_or_flush
+
+
+def cascade_soft_delete(db: Session, model, ids: Iterable[int]) -> dict:
+    """
+    Soft delete active `ids` of `model` and all their active descendants.
+    Returns {table name: rows deleted}.
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+
+    now = datetime.now(timezone.utc)
+    counts = _cascade(
+        db,
+        model,
+        ids,
+        before=lambda m: m.deleted_at.is_(None),
+        after=now,
+    )
+    commit_or_flush(db)
+    return counts
+
+
+def cascade_restore(db: Session, model, ids: Iterable[int]) -> dict:
+    """
+    Restore deleted `ids` of `model` and the descendants deleted with them.
+    Returns {table name: rows restored}.
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+
+    # Children are matched on the roots' deleted_at, which a lagging
+    # replica may not have yet.
+    stick_to_primary(db)
+    rows = db.execute(
+        with_deleted(
+            select(model.id, model.deleted_at)
+            .where(model.id.in_(ids), model.deleted_at.is_not(None))
+        )
+    ).all()
+
+    # Roots deleted by different cascades carry different timestamps.
+    by_timestamp = defaultdict(list)
+    for id, deleted_at in rows:
+        by_timestamp[deleted_at].append(id)
+
+    counts = defaultdict(int)
+    for deleted_at, group in by_timestamp.items():
+        restored = _cascade(
+            db,
+            model,
+            group,
+            before=lambda m, ts=deleted_at: m.deleted_at == ts,
+            after=None,
+        )
+        for table, count in restored.items():
+            counts[table] += count
+
+    commit_or_flush(db)
+    return dict(counts)
+
+
+# ---------------------------------------------------------
+# INTERNAL HELPERS
+# ---------------------------------------------------------
+def _child_relationships(model):
+    for rel in inspect(model).relationships:
+        if rel.direction is ONETOMANY and issubclass(rel.mapper.class_, SoftDeleteMixin):
+            yield rel
+
+
+def _topological_order(root) -> list:
+    """Reachable soft-deletable models, parents before children."""
+    order, visited = [], set()
+
+    def visit(model):
+        if model in visited:
+            return
+        visited.add(model)
+        for rel in _child_relationships(model):
+            visit(rel.mapper.class_)
+        order.append(model)
+
+    visit(root)
+    return list(reversed(order))
+
+
+def _cascade(db: Session, root, ids, *, before, after) -> dict:
+    """
+    Build one WHERE clause per reachable table, then update children before
+    parents so every subquery still sees its parents in the `before` state.
+    """
+    order = _topological_order(root)
+    conditions = defaultdict(list)
+    conditions[root].append(root.id.in_(ids))
+
+    for model in order:
+        selected = select(model.id).where(or_(*conditions[model]), before(model))
+        for rel in _child_relationships(model):
+            (_, remote), = rel.local_remote_pairs
+            conditions[rel.mapper.class_].append(remote.in_(selected))
+
+    counts = {}
+    update_returning = db.get_bind().dialect.update_returning
+    for model in reversed(order):
+        stmt = (
+            update(model)
+            .where(or_(*conditions[model]), before(model))
+            .values(deleted_at=after)
+            .execution_options(synchronize_session="fetch")
+        )
+        if update_returning:
+            touched = db.scalars(stmt.returning(model.id)).all()
+            invalidate(db, model, touched)
+            counts[model.__tablename__] = len(touched)
+        else:
+            counts[model.__tablename__] = db.execute(stmt).rowcount
+            cache = get_cache(model)
+            if cache is not None:
+                cache.clear()
+
+    return counts
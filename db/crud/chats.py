@@ -1,8 +1,40 @@
-from db.crud.base_repository import BaseRepository
-from db.models import ChatHistory, ChatMessage
+from typing import Iterable
+
+from sqlalchemy import select
+
+from db.crud.async_base_repository import AsyncBaseRepository
+from db.crud.base_repository import IN_CHUNK_SIZE, BaseRepository
+from db.models import ChatHistory, ChatMessage, Scenarios, Stakeholder
 
 class ChatHistoryRepository(BaseRepository):
     model = ChatHistory
 
 class ChatMessageRepository(BaseRepository):
-    model = ChatMessage
\ No newline at end of file
+    model = ChatMessage
+
+    def scenario_ids(self, ids: Iterable[int]) -> dict:
+        """
+        Return {message id: scenario id} for the active messages among `ids`,
+        following history -> stakeholder -> scenario in one joined query per
+        IN_CHUNK_SIZE ids. Messages whose scenario cannot be reached map to
+        None; missing or deleted messages are omitted.
+        """
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            stmt = (
+                select(ChatMessage.id, Scenarios.id)
+                .outerjoin(ChatMessage.history)
+                .outerjoin(ChatHistory.stakeholder)
+                .outerjoin(Stakeholder.scenario)
+                .where(ChatMessage.id.in_(chunk), ChatMessage.deleted_at.is_(None))
+            )
+            found.update(self.db.execute(stmt).all())
+        return found
+
+class AsyncChatHistoryRepository(AsyncBaseRepository):
+    model = ChatHistory
+
+class AsyncChatMessageRepository(AsyncBaseRepository):
+    model = ChatMessage
@@ -1,5 +1,116 @@
+from typing import Iterable
+
+from sqlalchemy import and_, func, select
+
 from db.crud.base_repository import BaseRepository
-from db.models import FeedbackReference
+from db.models import FeedbackReference, Requirements, Scenarios
 
 class FeedbackReferenceRepository(BaseRepository):
-    model = FeedbackReference
\ No newline at end of file
+    model = FeedbackReference
+
+    def counts_by_target(self, scenario_id: int) -> list:
+        """
+        Active feedback of a scenario grouped by what it is attached to:
+        rows of (requirement_id, chat_message_id, count). General feedback
+        is the (None, None) group.
+        """
+        stmt = (
+            select(
+                FeedbackReference.requirement_id,
+                FeedbackReference.chat_message_id,
+                func.count(FeedbackReference.id),
+            )
+            .where(
+                FeedbackReference.scenario_id == scenario_id,
+                FeedbackReference.deleted_at.is_(None),
+            )
+            .group_by(FeedbackReference.requirement_id, FeedbackReference.chat_message_id)
+        )
+        return self.db.execute(stmt).all()
+
+    def requirement_coverage(self, scenario_id: int) -> tuple:
+        """
+        (active requirements, active requirements with at least one active
+        feedback row) for a scenario, in one query.
+        """
+        stmt = (
+            select(
+                func.count(func.distinct(Requirements.id)),
+                func.count(func.distinct(FeedbackReference.requirement_id)),
+            )
+            .select_from(Requirements)
+            .outerjoin(
+                FeedbackReference,
+                and_(
+                    FeedbackReference.requirement_id == Requirements.id,
+                    FeedbackReference.scenario_id == scenario_id,
+                    FeedbackReference.deleted_at.is_(None),
+                ),
+            )
+            .where(Requirements.scenario_id == scenario_id, Requirements.deleted_at.is_(None))
+        )
+        total, covered = self.db.execute(stmt).one()
+        return total, covered
+
+    def marking_rows_for_owners(self, owner_ids: Iterable[int]) -> list:
+        """
+        One row per active scenario owned by `owner_ids`:
+        (owner_id, scenario_id, title, marking_status, total_feedback,
+        total_requirements, requirements_with_feedback), ordered by owner
+        then scenario. Both aggregates are grouped subqueries, so this is a
+        single query however many scenarios and feedback rows there are.
+        """
+        owner_ids = list(owner_ids)
+        if not owner_ids:
+            return []
+
+        owned = (
+            select(Scenarios.id)
+            .where(Scenarios.owner_id.in_(owner_ids), Scenarios.deleted_at.is_(None))
+        )
+
+        feedback_counts = (
+            select(
+                FeedbackReference.scenario_id,
+                func.count(FeedbackReference.id).label("total"),
+            )
+            .where(FeedbackReference.scenario_id.in_(owned), FeedbackReference.deleted_at.is_(None))
+            .group_by(FeedbackReference.scenario_id)
+            .subquery()
+        )
+
+        coverage = (
+            select(
+                Requirements.scenario_id,
+                func.count(func.distinct(Requirements.id)).label("total"),
+                func.count(func.distinct(FeedbackReference.requirement_id)).label("covered"),
+            )
+            .outerjoin(
+                FeedbackReference,
+                and_(
+                    FeedbackReference.requirement_id == Requirements.id,
+                    FeedbackReference.scenario_id == Requirements.scenario_id,
+                    FeedbackReference.deleted_at.is_(None),
+                ),
+            )
+            .where(Requirements.scenario_id.in_(owned), Requirements.deleted_at.is_(None))
+            .group_by(Requirements.scenario_id)
+            .subquery()
+        )
+
+        stmt = (
+            select(
+                Scenarios.owner_id,
+                Scenarios.id,
+                Scenarios.title,
+                Scenarios.marking_status,
+                func.coalesce(feedback_counts.c.total, 0),
+                func.coalesce(coverage.c.total, 0),
+                func.coalesce(coverage.c.covered, 0),
+            )
+            .outerjoin(feedback_counts, feedback_counts.c.scenario_id == Scenarios.id)
+            .outerjoin(coverage, coverage.c.scenario_id == Scenarios.id)
+            .where(Scenarios.owner_id.in_(owner_ids), Scenarios.deleted_at.is_(None))
+            .order_by(Scenarios.owner_id, Scenarios.id)
+        )
+        return self.db.execute(stmt).all()
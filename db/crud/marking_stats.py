@@ -0,0 +1,242 @@
+"""
+Incrementally maintained marking counters.
+
+scenario_marking_stats holds, per active scenario, the number of active
+feedback rows, active requirements, and active requirements with at least
+one active feedback row. requirement_feedback_stats holds the active
+feedback count per requirement. Services adjust them with atomic
+`col = col + delta` upserts as feedback and requirements change; recompute()
+rebuilds them from the source tables.
+"""
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, delete, func, select
+
+from db.crud.soft_delete import with_deleted
+from db.models import (
+    ChatHistory,
+    FeedbackReference,
+    RequirementFeedbackStats,
+    Requirements,
+    ScenarioMarkingStats,
+    Scenarios,
+    Stakeholder,
+)
+from db.unit_of_work import commit_or_flush
+from db.utils import upsert_insert
+
+_SCENARIO_COUNTERS = ("total_feedback", "total_requirements", "requirements_with_feedback")
+
+
+class MarkingStatsRepository:
+    """
+    Counters are derived data: rows are never soft-deleted and are keyed by
+    scenario / requirement id, so this does not extend BaseRepository.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    # -----------------------------
+    # READ
+    # -----------------------------
+    def get(self, scenario_id: int) -> Optional[ScenarioMarkingStats]:
+        return self.db.get(ScenarioMarkingStats, scenario_id, populate_existing=True)
+
+    def requirement_counts(self, scenario_id: int) -> dict:
+        """{requirement id: active feedback count} for requirements with feedback."""
+        rows = self.db.execute(
+            select(RequirementFeedbackStats.requirement_id, RequirementFeedbackStats.feedback_count)
+            .where(
+                RequirementFeedbackStats.scenario_id == scenario_id,
+                RequirementFeedbackStats.feedback_count > 0,
+            )
+        ).all()
+        return dict(rows)
+
+    # -----------------------------
+    # INCREMENTAL UPDATES
+    # -----------------------------
+    def scenario_created(self, scenario_id: int):
+        """Start a new scenario's counters at zero, as recompute() would."""
+        self._bump_scenarios({scenario_id: Counter()})
+        commit_or_flush(self.db)
+
+    def feedback_changed(self, items: Iterable[tuple], sign: int):
+        """
+        Account for feedback rows that became active (sign=+1) or inactive
+        (sign=-1). `items` are (scenario_id, requirement_id) pairs, one per
+        feedback row; requirement_id is None for unattached feedback.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        deltas = {scenario_id: Counter() for scenario_id, _ in items}
+        for scenario_id, _ in items:
+            deltas[scenario_id]["total_feedback"] += sign
+
+        per_requirement = Counter((s, r) for s, r in items if r is not None)
+        if per_requirement:
+            stmt = upsert_insert(self.db, RequirementFeedbackStats)
+            stmt = stmt.values([
+                {"requirement_id": r, "scenario_id": s, "feedback_count": sign * n}
+                for (s, r), n in per_requirement.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RequirementFeedbackStats.requirement_id],
+                set_={"feedback_count": RequirementFeedbackStats.feedback_count + stmt.excluded.feedback_count},
+            ).returning(RequirementFeedbackStats.requirement_id, RequirementFeedbackStats.feedback_count)
+            new_counts = dict(self.db.execute(stmt).all())
+
+            active = self._active_requirements(new_counts)
+            for (scenario_id, requirement_id), n in per_requirement.items():
+                if requirement_id not in active:
+                    continue
+                new = new_counts[requirement_id]
+                old = new - sign * n
+                deltas[scenario_id]["requirements_with_feedback"] += (new > 0) - (old > 0)
+
+        self._bump_scenarios(deltas)
+        commit_or_flush(self.db)
+
+    def requirements_changed(self, items: Iterable[tuple], sign: int):
+        """
+        Account for requirements that became active (sign=+1) or inactive
+        (sign=-1). `items` are (scenario_id, requirement_id) pairs.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        with_feedback = set(self.db.scalars(
+            select(RequirementFeedbackStats.requirement_id).where(
+                RequirementFeedbackStats.requirement_id.in_([r for _, r in items]),
+                RequirementFeedbackStats.feedback_count > 0,
+            )
+        ))
+
+        deltas = {scenario_id: Counter() for scenario_id, _ in items}
+        for scenario_id, requirement_id in items:
+            deltas[scenario_id]["total_requirements"] += sign
+            if requirement_id in with_feedback:
+                deltas[scenario_id]["requirements_with_feedback"] += sign
+
+        self._bump_scenarios(deltas)
+        commit_or_flush(self.db)
+
+    # -----------------------------
+    # REBUILD
+    # -----------------------------
+    def recompute(self, scenario_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Rebuild the counters from the source tables, for `scenario_ids` or
+        (None) for every scenario. Returns the number of scenario rows written.
+        """
+        if scenario_ids is not None:
+            scenario_ids = list(scenario_ids)
+            if not scenario_ids:
+                return 0
+
+        def scoped(stmt, column):
+            return stmt if scenario_ids is None else stmt.where(column.in_(scenario_ids))
+
+        self.db.execute(scoped(delete(RequirementFeedbackStats), RequirementFeedbackStats.scenario_id))
+        self.db.execute(scoped(delete(ScenarioMarkingStats), ScenarioMarkingStats.scenario_id))
+
+        per_requirement = scoped(
+            select(
+                FeedbackReference.requirement_id,
+                func.min(FeedbackReference.scenario_id),
+                func.count(FeedbackReference.id),
+            )
+            .where(FeedbackReference.requirement_id.is_not(None), FeedbackReference.deleted_at.is_(None)),
+            FeedbackReference.scenario_id,
+        ).group_by(FeedbackReference.requirement_id)
+        self.db.execute(
+            RequirementFeedbackStats.__table__.insert().from_select(
+                ["requirement_id", "scenario_id", "feedback_count"], per_requirement
+            )
+        )
+
+        feedback_totals = scoped(
+            select(FeedbackReference.scenario_id, func.count(FeedbackReference.id).label("total"))
+            .where(FeedbackReference.deleted_at.is_(None)),
+            FeedbackReference.scenario_id,
+        ).group_by(FeedbackReference.scenario_id).subquery()
+
+        coverage = scoped(
+            select(
+                Requirements.scenario_id,
+                func.count(Requirements.id).label("total"),
+                func.count(RequirementFeedbackStats.requirement_id).label("covered"),
+            )
+            .outerjoin(
+                RequirementFeedbackStats,
+                and_(
+                    RequirementFeedbackStats.requirement_id == Requirements.id,
+                    RequirementFeedbackStats.feedback_count > 0,
+                ),
+            )
+            .where(Requirements.deleted_at.is_(None)),
+            Requirements.scenario_id,
+        ).group_by(Requirements.scenario_id).subquery()
+
+        scenarios = scoped(
+            select(
+                Scenarios.id,
+                func.coalesce(feedback_totals.c.total, 0),
+                func.coalesce(coverage.c.total, 0),
+                func.coalesce(coverage.c.covered, 0),
+            )
+            .outerjoin(feedback_totals, feedback_totals.c.scenario_id == Scenarios.id)
+            .outerjoin(coverage, coverage.c.scenario_id == Scenarios.id)
+            .where(Scenarios.deleted_at.is_(None)),
+            Scenarios.id,
+        )
+        written = self.db.execute(
+            ScenarioMarkingStats.__table__.insert().from_select(
+                ["scenario_id", *_SCENARIO_COUNTERS], scenarios
+            )
+        ).rowcount
+
+        commit_or_flush(self.db)
+        return written
+
+    def recompute_for_history(self, history_id: int) -> int:
+        """Rebuild the counters of the scenario a chat history belongs to."""
+        scenario_id = self.db.scalar(with_deleted(
+            select(Stakeholder.scenario_id)
+            .join(ChatHistory, ChatHistory.stakeholder_id == Stakeholder.id)
+            .where(ChatHistory.id == history_id)
+        ))
+        if scenario_id is None:
+            return 0
+        return self.recompute([scenario_id])
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _active_requirements(self, requirement_ids) -> set:
+        return set(self.db.scalars(
+            select(Requirements.id).where(
+                Requirements.id.in_(list(requirement_ids)), Requirements.deleted_at.is_(None)
+            )
+        ))
+
+    def _bump_scenarios(self, deltas: dict):
+        """Add per-scenario counter deltas, creating missing rows at zero."""
+        rows = [
+            {"scenario_id": scenario_id, **{name: delta[name] for name in _SCENARIO_COUNTERS}}
+            for scenario_id, delta in deltas.items()
+        ]
+        stmt = upsert_insert(self.db, ScenarioMarkingStats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScenarioMarkingStats.scenario_id],
+            set_={
+                name: getattr(ScenarioMarkingStats, name) + getattr(stmt.excluded, name)
+                for name in _SCENARIO_COUNTERS
+            },
+        )
+        self.db.execute(stmt)
@@ -1,4 +1,8 @@
-from db.crud.base_repository import BaseRepository
+from typing import Iterable
+
+from sqlalchemy import select
+
+from db.crud.base_repository import IN_CHUNK_SIZE, BaseRepository
 from db.models import (
     Scenarios,
     Requirements,
@@ -11,6 +15,22 @@ from db.models import (
 class ScenariosRepository(BaseRepository):
     model = Scenarios
 
+    def owner_ids(self, ids: Iterable[int]) -> dict:
+        """
+        Return {scenario id: owner id} for the active scenarios among `ids`,
+        one query per IN_CHUNK_SIZE ids. Missing or deleted scenarios are
+        omitted.
+        """
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            stmt = select(Scenarios.id, Scenarios.owner_id).where(
+                Scenarios.id.in_(chunk), Scenarios.deleted_at.is_(None)
+            )
+            found.update(self.db.execute(stmt).all())
+        return found
+
 class RequirementsRepository(BaseRepository):
     model = Requirements
 
@@ -1,5 +1,47 @@
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from db.crud.cache import invalidate
+from db.models import SoftDeleteMixin
+from db.unit_of_work import commit_or_flush
+from db.utils import update_returning_ids
+
+# ---------------------------------------------------------
+# Global soft-delete filter
+#
+# Every ORM SELECT (including lazy and eager relationship loads) only sees
+# rows with deleted_at IS NULL. Statements that need deleted rows opt out
+# with with_deleted(stmt), i.e. execution_options(include_deleted=True).
+# Refreshes of already-loaded objects are never filtered.
+# ---------------------------------------------------------
+INCLUDE_DELETED = "include_deleted"
+
+
+def with_deleted(stmt):
+    """Let `stmt` (a select() or Query) see soft-deleted rows too."""
+    return stmt.execution_options(**{INCLUDE_DELETED: True})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted(execute_state: ORMExecuteState):
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(
+            SoftDeleteMixin,
+            lambda cls: cls.deleted_at.is_(None),
+            include_aliases=True,
+        )
+    )
+
 
 def soft_delete(db: Session, model, id: int):
     """Soft delete a row by setting deleted_at."""
@@ -12,16 +54,17 @@ def soft_delete(db: Session, model, id: int):
         return None
 
     obj.deleted_at = datetime.now(timezone.utc)
+    invalidate(db, model, [obj.id])
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    if commit_or_flush(db):
+        db.refresh(obj)
     return obj
 
 
 def restore(db: Session, model, id: int):
     """Restore a soft-deleted row."""
     obj = (
-        db.query(model)
+        with_deleted(db.query(model))
         .filter(model.id == id, model.deleted_at.is_not(None))
         .first()
     )
@@ -29,12 +72,51 @@ def restore(db: Session, model, id: int):
         return None
 
     obj.deleted_at = None
+    invalidate(db, model, [obj.id])
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    if commit_or_flush(db):
+        db.refresh(obj)
     return obj
 
 
+def soft_delete_many(db: Session, model, ids: Iterable[int]) -> list:
+    """Soft delete active rows by id with one UPDATE. Returns the ids deleted."""
+    ids = list(ids)
+    if not ids:
+        return []
+    return _set_deleted_at(
+        db, model, (model.id.in_(ids), model.deleted_at.is_(None)), datetime.now(timezone.utc)
+    )
+
+
+def restore_many(db: Session, model, ids: Iterable[int]) -> list:
+    """Restore soft-deleted rows by id with one UPDATE. Returns the ids restored."""
+    ids = list(ids)
+    if not ids:
+        return []
+    return _set_deleted_at(
+        db, model, (model.id.in_(ids), model.deleted_at.is_not(None)), None
+    )
+
+
+def soft_delete_where(db: Session, model, *criteria, **filters) -> list:
+    """
+    Soft delete every active row matching `criteria` and `filters` with one
+    UPDATE. Returns the ids deleted.
+    """
+    criteria = list(criteria)
+    criteria.extend(getattr(model, key) == value for key, value in filters.items())
+    criteria.append(model.deleted_at.is_(None))
+    return _set_deleted_at(db, model, criteria, datetime.now(timezone.utc))
+
+
+def _set_deleted_at(db: Session, model, criteria, deleted_at) -> list:
+    ids = update_returning_ids(db, model, criteria, {"deleted_at": deleted_at})
+    invalidate(db, model, ids)
+    commit_or_flush(db)
+    return ids
+
+
 def get_active(db: Session, model, **filters):
     """Return only non-deleted rows."""
     return (
@@ -48,7 +130,7 @@ def get_active(db: Session, model, **filters):
 def get_deleted(db: Session, model, **filters):
     """Return only soft-deleted rows."""
     return (
-        db.query(model)
+        with_deleted(db.query(model))
         .filter(model.deleted_at.is_not(None))
         .filter_by(**filters)
         .all()
@@ -57,4 +139,4 @@ def get_deleted(db: Session, model, **filters):
 
 def get_all(db: Session, model, **filters):
     """Return all rows, including deleted ones."""
-    return db.query(model).filter_by(**filters).all()
\ No newline at end of file
+    return with_deleted(db.query(model)).filter_by(**filters).all()
\ No newline at end of file
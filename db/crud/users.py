@@ -1,3 +1,7 @@
+from typing import Iterable
+
+from sqlalchemy import func, select
+
 from db.crud.base_repository import BaseRepository
 from db.models import Users, StudentsOfClass, ClassTeacher
 
@@ -7,5 +11,26 @@ class UsersRepository(BaseRepository):
 class StudentsOfClassRepository(BaseRepository):
     model = StudentsOfClass
 
+    def taught_by(self, teacher_id: int, user_ids: Iterable[int]) -> bool:
+        """
+        True when `teacher_id` actively teaches a class that every one of
+        `user_ids` is an active student of, checked in one grouped query.
+        """
+        user_ids = set(user_ids)
+        stmt = (
+            select(StudentsOfClass.class_id)
+            .join(ClassTeacher, ClassTeacher.class_id == StudentsOfClass.class_id)
+            .where(
+                ClassTeacher.teacher_id == teacher_id,
+                ClassTeacher.deleted_at.is_(None),
+                StudentsOfClass.user_id.in_(user_ids),
+                StudentsOfClass.deleted_at.is_(None),
+            )
+            .group_by(StudentsOfClass.class_id)
+            .having(func.count(func.distinct(StudentsOfClass.user_id)) == len(user_ids))
+            .limit(1)
+        )
+        return self.db.execute(stmt).first() is not None
+
 class ClassTeacherRepository(BaseRepository):
     model = ClassTeacher
\ No newline at end of file
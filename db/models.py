@@ -3,7 +3,7 @@ from enum import Enum as PyEnum
 
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, ForeignKey,
-    Enum, TIMESTAMP, func
+    Enum, Index, TIMESTAMP, UniqueConstraint, func, text
 )
 from sqlalchemy.orm import relationship, declarative_base
 
@@ -15,6 +15,14 @@ Base = declarative_base()
 class SoftDeleteMixin:
     deleted_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
+# ---------------------------------------------------------
+# Partial index over active (not soft-deleted) rows
+# ---------------------------------------------------------
+ACTIVE_ROWS = text("deleted_at IS NULL")
+
+def active_index(name, *columns):
+    return Index(name, *columns, postgresql_where=ACTIVE_ROWS, sqlite_where=ACTIVE_ROWS)
+
 # ---------------------------------------------------------
 # Created at mixin
 # ---------------------------------------------------------
@@ -68,6 +76,10 @@ class Class(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class ClassTeacher(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "class_teacher"
+    __table_args__ = (
+        Index("ix_class_teacher_class_teacher", "class_id", "teacher_id"),
+        active_index("ix_class_teacher_active_teacher", "teacher_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -81,6 +93,10 @@ class ClassTeacher(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class StudentsOfClass(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "students_of_class"
+    __table_args__ = (
+        UniqueConstraint("class_id", "user_id", name="uq_students_of_class_class_user"),
+        active_index("ix_students_of_class_active_user", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -106,6 +122,9 @@ class SeniorDevTemplates(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class Scenarios(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "scenarios"
+    __table_args__ = (
+        active_index("ix_scenarios_active_owner", "owner_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -136,6 +155,11 @@ class Categories(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class ScenarioCategories(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "scenario_categories"
+    __table_args__ = (
+        UniqueConstraint(
+            "scenario_id", "category_id", name="uq_scenario_categories_scenario_category"
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
@@ -149,6 +173,9 @@ class ScenarioCategories(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class Stakeholder(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "stakeholder"
+    __table_args__ = (
+        active_index("ix_stakeholder_active_scenario", "scenario_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
@@ -166,6 +193,9 @@ class Stakeholder(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class ChatHistory(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        active_index("ix_chat_history_active_stakeholder", "stakeholder_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     stakeholder_id = Column(Integer, ForeignKey("stakeholder.id"), nullable=False)
@@ -178,6 +208,9 @@ class ChatHistory(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class ChatMessage(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "chat_message"
+    __table_args__ = (
+        active_index("ix_chat_message_active_history", "chat_history_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     chat_history_id = Column(Integer, ForeignKey("chat_history.id"), nullable=False)
@@ -193,6 +226,9 @@ class ChatMessage(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class Requirements(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "requirements"
+    __table_args__ = (
+        active_index("ix_requirements_active_scenario", "scenario_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
@@ -207,6 +243,11 @@ class Requirements(Base, SoftDeleteMixin, TimestampMixin):
 # ---------------------------------------------------------
 class FeedbackReference(Base, SoftDeleteMixin, TimestampMixin):
     __tablename__ = "feedback_reference"
+    __table_args__ = (
+        active_index("ix_feedback_reference_active_scenario", "scenario_id", "id"),
+        active_index("ix_feedback_reference_active_requirement", "requirement_id"),
+        active_index("ix_feedback_reference_active_chat_message", "chat_message_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     feedback = Column(Text, nullable=False)
@@ -216,4 +257,27 @@ class FeedbackReference(Base, SoftDeleteMixin, TimestampMixin):
 
     scenario = relationship("Scenarios", back_populates="feedback")
     requirement = relationship("Requirements", back_populates="feedback_refs")
-    chat_message = relationship("ChatMessage", back_populates="feedback_refs")
\ No newline at end of file
+    chat_message = relationship("ChatMessage", back_populates="feedback_refs")
+
+# ---------------------------------------------------------
+# MARKING STATS (derived counters, maintained by the services;
+# rebuild with `python -m app.cli rebuild-marking-stats`)
+# ---------------------------------------------------------
+class ScenarioMarkingStats(Base):
+    __tablename__ = "scenario_marking_stats"
+
+    scenario_id = Column(Integer, ForeignKey("scenarios.id"), primary_key=True)
+    total_feedback = Column(Integer, nullable=False, default=0, server_default="0")
+    total_requirements = Column(Integer, nullable=False, default=0, server_default="0")
+    requirements_with_feedback = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class RequirementFeedbackStats(Base):
+    __tablename__ = "requirement_feedback_stats"
+    __table_args__ = (
+        Index("ix_requirement_feedback_stats_scenario", "scenario_id"),
+    )
+
+    requirement_id = Column(Integer, ForeignKey("requirements.id"), primary_key=True)
+    scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
+    feedback_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,79 @@
+"""
+QueuePool with checkout metrics.
+
+Records how long each checkout waited for a connection (as a cumulative
+histogram), how many checkouts timed out, and exposes the pool's in-use,
+idle and overflow counts alongside them.
+"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._metrics_lock = threading.Lock()
+        self._bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+            raise
+        self._record_wait(time.perf_counter() - started)
+        return conn
+
+    def _record_wait(self, seconds: float):
+        waited_ms = seconds * 1000
+        bucket = next(
+            (i for i, bound in enumerate(WAIT_BUCKETS_MS) if waited_ms <= bound),
+            len(WAIT_BUCKETS_MS),
+        )
+        with self._metrics_lock:
+            self._bucket_counts[bucket] += 1
+            self._checkouts += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            histogram = {}
+            running = 0
+            for bound, count in zip(WAIT_BUCKETS_MS, self._bucket_counts):
+                running += count
+                histogram[f"le_{bound}ms"] = running
+            histogram["le_inf"] = running + self._bucket_counts[-1]
+
+            return {
+                "size": self.size(),
+                "in_use": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "timeout": self.timeout(),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_total * 1000, 3),
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+                "wait_histogram": histogram,
+            }
+
+
+def pool_stats(engine) -> dict | None:
+    """Metrics for `engine`'s pool, or None if it is not instrumented."""
+    if engine is None or not isinstance(engine.pool, InstrumentedQueuePool):
+        return None
+    return engine.pool.stats()
@@ -0,0 +1,61 @@
+"""
+Per-request session accounting.
+
+A Session only checks a connection out of the pool when it first executes
+SQL, so a request served from cache (or rejected before touching the
+database) never uses the pool. These counters make that visible: every
+request session is counted, and those that never began a transaction are
+counted as zero-I/O.
+"""
+import threading
+from collections.abc import Generator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_DID_IO_KEY = "request_did_io"
+
+
+class RequestStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.zero_io = 0
+
+    def record(self, did_io: bool):
+        with self._lock:
+            self.requests += 1
+            if not did_io:
+                self.zero_io += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.zero_io = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "zero_io": self.zero_io,
+                "with_io": self.requests - self.zero_io,
+            }
+
+
+request_stats = RequestStats()
+
+
+def request_session(factory) -> Generator[Session, None, None]:
+    """Yield a session from `factory`, close it and record whether it did I/O."""
+    db = factory()
+    try:
+        yield db
+    finally:
+        did_io = bool(db.info.get(_DID_IO_KEY))
+        db.close()
+        request_stats.record(did_io)
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_io(session, transaction, connection):
+    session.info[_DID_IO_KEY] = True
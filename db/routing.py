@@ -0,0 +1,67 @@
+"""
+Primary/replica statement routing.
+
+RoutingSession sends plain SELECTs to the replica bind and everything else
+(flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw SQL) to the
+primary. The first write makes the session "sticky": every later statement
+in that session also goes to the primary, so a request always reads what
+it just wrote even if the replica is lagging.
+"""
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+_STICKY_KEY = "routing_sticky_primary"
+_ON_WRITE_KEY = "routing_on_first_write"
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replica_bind=None, **kw):
+        super().__init__(*args, **kw)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.replica_bind is None or self.info.get(_STICKY_KEY):
+            return primary
+        if clause is None and not self._flushing:
+            # Bare get_bind() / connection(): dialect lookups and explicit
+            # connection requests, which callers expect to be the primary.
+            return primary
+
+        if self._flushing or not _is_plain_select(clause):
+            _mark_written(self)
+            return primary
+
+        return self.replica_bind
+
+
+def stick_to_primary(db: Session):
+    """Route every remaining statement of `db` to the primary."""
+    db.info[_STICKY_KEY] = True
+
+
+def is_sticky(db: Session) -> bool:
+    return bool(db.info.get(_STICKY_KEY))
+
+
+def reads_from_replica(db: Session) -> bool:
+    """True when plain SELECTs issued through `db` are served by a replica."""
+    return getattr(db, "replica_bind", None) is not None and not is_sticky(db)
+
+
+def on_first_write(db: Session, callback):
+    """Call `callback()` once, when `db` first routes a write to the primary."""
+    if is_sticky(db):
+        callback()
+    else:
+        db.info.setdefault(_ON_WRITE_KEY, []).append(callback)
+
+
+def _mark_written(db: Session):
+    db.info[_STICKY_KEY] = True
+    for callback in db.info.pop(_ON_WRITE_KEY, []):
+        callback()
+
+
+def _is_plain_select(clause) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
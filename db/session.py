@@ -1,26 +1,104 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from collections.abc import Generator
-from db.config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from collections.abc import AsyncGenerator, Generator
+from db.config import (
+    DATABASE_URL,
+    MAX_OVERFLOW,
+    POOL_PRE_PING,
+    POOL_RECYCLE,
+    POOL_SIZE,
+    POOL_TIMEOUT,
+    REPLICA_DATABASE_URL,
+)
+from db.pool import InstrumentedQueuePool
+from db.request_stats import request_session
+from db.routing import RoutingSession
+
 
+POOL_OPTIONS = {
+    "poolclass": InstrumentedQueuePool,
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "pool_pre_ping": POOL_PRE_PING,
+}
 
 engine = create_engine(
     DATABASE_URL,
     future=True,
     echo=False,
+    **POOL_OPTIONS,
+)
+
+# Optional read replica; plain SELECTs are routed here by RoutingSession.
+replica_engine = (
+    create_engine(REPLICA_DATABASE_URL, future=True, echo=False, **POOL_OPTIONS)
+    if REPLICA_DATABASE_URL
+    else None
 )
 
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
     bind=engine,
+    replica_bind=replica_engine,
     future=True,
 )
 
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+    # No connection is checked out until the session first executes SQL.
+    yield from request_session(SessionLocal)
+
+
+# ---------------------------------------------------------
+# Async engine (created on first use so the async driver is
+# only required by code paths that actually use it)
+# ---------------------------------------------------------
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+# expire_on_commit=False: attribute access after commit must not trigger
+# implicit (and therefore un-awaitable) refresh queries.
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Same pool settings as the sync engines. InstrumentedQueuePool is a
+# sync pool, so the async engine uses SQLAlchemy's asyncio-aware queue pool.
+ASYNC_POOL_OPTIONS = {**POOL_OPTIONS, "poolclass": AsyncAdaptedQueuePool}
+
+_async_engine = None
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in `url` for its async counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(DATABASE_URL),
+            echo=False,
+            **ASYNC_POOL_OPTIONS,
+        )
+    return _async_engine
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
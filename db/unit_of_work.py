@@ -0,0 +1,75 @@
+from contextlib import asynccontextmanager, contextmanager
+from collections.abc import AsyncGenerator, Generator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+def in_unit_of_work(db: Session) -> bool:
+    """True while `db` is inside a unit_of_work() scope."""
+    return db.info.get(_DEPTH_KEY, 0) > 0
+
+
+def commit_or_flush(db: Session) -> bool:
+    """
+    Commit the session, or only flush it inside a unit of work.
+    Returns True when a commit was issued.
+    """
+    if in_unit_of_work(db):
+        db.flush()
+        return False
+
+    db.commit()
+    return True
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Generator[Session, None, None]:
+    """
+    Group repository writes into one transaction.
+
+    Inside the scope repository writes are flushed, not committed. The
+    outermost scope commits once on success and rolls back on any error;
+    nested scopes simply join the outer transaction.
+    """
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except BaseException:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
+
+
+async def async_commit_or_flush(db: AsyncSession) -> bool:
+    """Async counterpart of commit_or_flush()."""
+    if in_unit_of_work(db):
+        await db.flush()
+        return False
+
+    await db.commit()
+    return True
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of unit_of_work(); shares its depth counter."""
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            await db.commit()
+    except BaseException:
+        if depth == 0:
+            await db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
@@ -0,0 +1,60 @@
+from sqlalchemy import inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Dialect-specific INSERT constructs that support ON CONFLICT.
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def update_returning_ids(db: Session, model, criteria, values: dict) -> list:
+    """
+    Run one UPDATE of `model` rows matching `criteria` and return their ids.
+    Uses UPDATE ... RETURNING where the dialect supports it, otherwise
+    selects the ids first and updates by id.
+    """
+    stmt = update(model).where(*criteria).values(**values)
+    if db.get_bind().dialect.update_returning:
+        return db.scalars(stmt.returning(model.id)).all()
+
+    # `criteria` carries its own deleted_at conditions.
+    ids = db.scalars(
+        select(model.id).where(*criteria).execution_options(include_deleted=True)
+    ).all()
+    if ids:
+        db.execute(update(model).where(model.id.in_(ids)).values(**values))
+    return ids
+
+
+def loaded_values(obj) -> dict:
+    """The column values currently loaded on `obj`."""
+    state = inspect(obj)
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def restore_loaded(snapshots):
+    """
+    Re-apply (obj, loaded_values(obj)) snapshots taken before a commit so
+    the objects need no refresh SELECT afterwards.
+    """
+    for obj, values in snapshots:
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+
+
+def upsert_insert(db: Session, model):
+    """
+    insert(model) for the session's dialect, with on_conflict_do_nothing()
+    / on_conflict_do_update() available (PostgreSQL and SQLite).
+    """
+    name = db.get_bind().dialect.name
+    if name not in _UPSERT_INSERTS:
+        raise RuntimeError(f"ON CONFLICT inserts are not supported on {name!r}")
+    return _UPSERT_INSERTS[name](model)
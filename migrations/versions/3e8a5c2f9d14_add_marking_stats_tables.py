@@ -0,0 +1,76 @@
+"""Add marking stats tables
+
+Revision ID: 3e8a5c2f9d14
+Revises: b7d41e9a0c3f
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a5c2f9d14'
+down_revision: Union[str, Sequence[str], None] = 'b7d41e9a0c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scenario_marking_stats",
+        sa.Column("scenario_id", sa.Integer(), sa.ForeignKey("scenarios.id"), primary_key=True),
+        sa.Column("total_feedback", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_requirements", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("requirements_with_feedback", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "requirement_feedback_stats",
+        sa.Column("requirement_id", sa.Integer(), sa.ForeignKey("requirements.id"), primary_key=True),
+        sa.Column("scenario_id", sa.Integer(), sa.ForeignKey("scenarios.id"), nullable=False),
+        sa.Column("feedback_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_requirement_feedback_stats_scenario",
+        "requirement_feedback_stats",
+        ["scenario_id"],
+    )
+
+    # Backfill from existing data (same definitions as
+    # MarkingStatsRepository.recompute).
+    op.execute(
+        """
+        INSERT INTO requirement_feedback_stats (requirement_id, scenario_id, feedback_count)
+        SELECT requirement_id, MIN(scenario_id), COUNT(id)
+        FROM feedback_reference
+        WHERE requirement_id IS NOT NULL AND deleted_at IS NULL
+        GROUP BY requirement_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO scenario_marking_stats
+            (scenario_id, total_feedback, total_requirements, requirements_with_feedback)
+        SELECT
+            s.id,
+            (SELECT COUNT(*) FROM feedback_reference f
+             WHERE f.scenario_id = s.id AND f.deleted_at IS NULL),
+            (SELECT COUNT(*) FROM requirements r
+             WHERE r.scenario_id = s.id AND r.deleted_at IS NULL),
+            (SELECT COUNT(*) FROM requirements r
+             JOIN requirement_feedback_stats rs ON rs.requirement_id = r.id
+             WHERE r.scenario_id = s.id AND r.deleted_at IS NULL AND rs.feedback_count > 0)
+        FROM scenarios s
+        WHERE s.deleted_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_requirement_feedback_stats_scenario", table_name="requirement_feedback_stats")
+    op.drop_table("requirement_feedback_stats")
+    op.drop_table("scenario_marking_stats")
@@ -0,0 +1,51 @@
+"""Unique scenario category links
+
+Revision ID: 9c2f4e7a1b36
+Revises: 3e8a5c2f9d14
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f4e7a1b36'
+down_revision: Union[str, Sequence[str], None] = '3e8a5c2f9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keep one row per (scenario_id, category_id): the oldest active link if
+# there is one, otherwise the oldest deleted link.
+DEDUPE = """
+DELETE FROM scenario_categories
+WHERE id NOT IN (
+    SELECT COALESCE(MIN(CASE WHEN deleted_at IS NULL THEN id END), MIN(id))
+    FROM scenario_categories
+    GROUP BY scenario_id, category_id
+)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(DEDUPE))
+    op.drop_index("ix_scenario_categories_scenario_category", table_name="scenario_categories")
+    with op.batch_alter_table("scenario_categories") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_scenario_categories_scenario_category", ["scenario_id", "category_id"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("scenario_categories") as batch_op:
+        batch_op.drop_constraint("uq_scenario_categories_scenario_category", type_="unique")
+    op.create_index(
+        "ix_scenario_categories_scenario_category",
+        "scenario_categories",
+        ["scenario_id", "category_id"],
+    )
@@ -0,0 +1,57 @@
+"""Add foreign key and soft-delete indexes
+
+Revision ID: b7d41e9a0c3f
+Revises: 717bbf00a9eb
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e9a0c3f'
+down_revision: Union[str, Sequence[str], None] = '717bbf00a9eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_ROWS = sa.text("deleted_at IS NULL")
+
+# (index name, table, columns, partial over active rows only)
+INDEXES = [
+    ("ix_class_teacher_class_teacher", "class_teacher", ["class_id", "teacher_id"], False),
+    ("ix_class_teacher_active_teacher", "class_teacher", ["teacher_id"], True),
+    ("ix_students_of_class_class_user", "students_of_class", ["class_id", "user_id"], False),
+    ("ix_students_of_class_active_user", "students_of_class", ["user_id"], True),
+    ("ix_scenarios_active_owner", "scenarios", ["owner_id", "id"], True),
+    ("ix_scenario_categories_scenario_category", "scenario_categories", ["scenario_id", "category_id"], False),
+    ("ix_stakeholder_active_scenario", "stakeholder", ["scenario_id", "id"], True),
+    ("ix_chat_history_active_stakeholder", "chat_history", ["stakeholder_id", "id"], True),
+    ("ix_chat_message_active_history", "chat_message", ["chat_history_id", "id"], True),
+    ("ix_requirements_active_scenario", "requirements", ["scenario_id", "id"], True),
+    ("ix_feedback_reference_active_scenario", "feedback_reference", ["scenario_id", "id"], True),
+    ("ix_feedback_reference_active_requirement", "feedback_reference", ["requirement_id"], True),
+    ("ix_feedback_reference_active_chat_message", "feedback_reference", ["chat_message_id"], True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns, partial in INDEXES:
+        where = ACTIVE_ROWS if partial else None
+        op.create_index(
+            name,
+            table,
+            columns,
+            postgresql_where=where,
+            sqlite_where=where,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,51 @@
+"""Unique class memberships
+
+Revision ID: d4a81f6c2e57
+Revises: 9c2f4e7a1b36
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a81f6c2e57'
+down_revision: Union[str, Sequence[str], None] = '9c2f4e7a1b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keep one row per (class_id, user_id): the oldest active membership if
+# there is one, otherwise the oldest deleted membership.
+DEDUPE = """
+DELETE FROM students_of_class
+WHERE id NOT IN (
+    SELECT COALESCE(MIN(CASE WHEN deleted_at IS NULL THEN id END), MIN(id))
+    FROM students_of_class
+    GROUP BY class_id, user_id
+)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(DEDUPE))
+    op.drop_index("ix_students_of_class_class_user", table_name="students_of_class")
+    with op.batch_alter_table("students_of_class") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_students_of_class_class_user", ["class_id", "user_id"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("students_of_class") as batch_op:
+        batch_op.drop_constraint("uq_students_of_class_class_user", type_="unique")
+    op.create_index(
+        "ix_students_of_class_class_user",
+        "students_of_class",
+        ["class_id", "user_id"],
+    )
@@ -2,6 +2,7 @@
 Shared pytest fixtures for REGAI backend tests.
 Uses SQLite in-memory database for fast, isolated tests.
 """
+import asyncio
 import sys
 from pathlib import Path
 
@@ -12,9 +13,11 @@ if _root_str not in sys.path:
     sys.path.insert(0, _root_str)
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
+from db.crud.cache import clear_caches
 from db.models import Base
 
 
@@ -53,6 +56,45 @@ def db_session(engine):
         session.close()
 
 
+@pytest.fixture(scope="function")
+def async_runner():
+    """Event loop for async tests (run coroutines with async_runner.run)."""
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.fixture(scope="function")
+def async_engine(async_runner):
+    """Fresh in-memory aiosqlite engine per test."""
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool, echo=False)
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async_runner.run(create_schema())
+    yield engine
+    async_runner.run(engine.dispose())
+
+
+@pytest.fixture(scope="function")
+def async_session(async_runner, async_engine):
+    """AsyncSession configured like db.session.AsyncSessionLocal."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    session = AsyncSessionLocal()
+    yield session
+    async_runner.run(session.close())
+
+
 def make_user_data(**overrides):
     """Factory for user creation data."""
     data = {
@@ -64,3 +106,39 @@ def make_user_data(**overrides):
         **overrides,
     }
     return data
+
+
+@pytest.fixture(autouse=True)
+def _reset_repository_caches():
+    """Cached rows must not leak between tests (ids repeat per fresh database)."""
+    yield
+    clear_caches()
+
+
+class StatementLog(list):
+    """SQL statements executed on the test engine, in order."""
+
+    def verbs(self) -> list:
+        """The leading keyword of each statement (SELECT, INSERT, ...)."""
+        return [statement.split()[0].upper() for statement in self]
+
+
+@pytest.fixture
+def statements(engine):
+    """Record every statement sent to `engine` while the test runs."""
+    recorded = StatementLog()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement.strip())
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def commits(db_session):
+    """One entry per commit of `db_session`."""
+    recorded = []
+    event.listen(db_session, "after_commit", lambda session: recorded.append(1))
+    return recorded
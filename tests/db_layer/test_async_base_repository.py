@@ -0,0 +1,78 @@
+"""Tests for AsyncBaseRepository against aiosqlite."""
+import pytest
+from sqlalchemy import select
+
+from db.crud.async_base_repository import AsyncBaseRepository
+from db.models import Users
+from db.unit_of_work import async_unit_of_work
+
+from tests.conftest import make_user_data
+
+
+class AsyncUsersRepository(AsyncBaseRepository):
+    model = Users
+
+
+@pytest.fixture
+def users_repo(async_session):
+    return AsyncUsersRepository(async_session)
+
+
+class TestAsyncBaseRepository:
+    """AsyncBaseRepository mirrors BaseRepository."""
+
+    def test_crud_and_soft_delete(self, async_runner, users_repo):
+        async def scenario():
+            user = await users_repo.create(**make_user_data())
+            assert user.id is not None
+
+            updated = await users_repo.update(user.id, fname="Changed")
+            assert updated.fname == "Changed"
+
+            assert await users_repo.delete(user.id) is not None
+            assert await users_repo.get(user.id) is None
+            assert len(await users_repo.all()) == 1
+
+            restored = await users_repo.restore(user.id)
+            assert restored.deleted_at is None
+            assert (await users_repo.get(user.id)).fname == "Changed"
+
+        async_runner.run(scenario())
+
+    def test_update_keeps_pending_changes(self, async_runner, users_repo):
+        async def scenario():
+            user = await users_repo.create(**make_user_data())
+            async with async_unit_of_work(users_repo.db):
+                user.lname = "Pending"
+                await users_repo.update(user.id, fname="Changed")
+
+            row = (await users_repo.db.execute(select(Users.fname, Users.lname))).one()
+            assert tuple(row) == ("Changed", "Pending")
+
+        async_runner.run(scenario())
+
+    def test_bulk_and_pagination(self, async_runner, users_repo):
+        async def scenario():
+            users = await users_repo.create_many(
+                make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+                for i in range(5)
+            )
+            ids = [u.id for u in users]
+
+            await users_repo.delete_many(ids[:1])
+            updated = await users_repo.update_many(ids, lname="Bulk")
+            assert [u.id for u in updated] == ids[1:]
+
+            found = await users_repo.get_many(ids)
+            assert set(found) == set(ids[1:])
+
+            page = await users_repo.list_page(limit=3)
+            assert [u.id for u in page.items] == ids[1:4]
+            page = await users_repo.list_page(after_id=page.next_after_id, limit=3)
+            assert [u.id for u in page.items] == ids[4:]
+            assert page.next_after_id is None
+
+            batches = [batch async for batch in users_repo.iter_batches(batch_size=3)]
+            assert [len(b) for b in batches] == [3, 1]
+
+        async_runner.run(scenario())
@@ -1,5 +1,9 @@
 """Tests for BaseRepository soft delete and filtering behavior."""
 import pytest
+from sqlalchemy import text
+
+import db.crud.base_repository as base_repository
+from db.unit_of_work import unit_of_work
 
 from tests.conftest import make_user_data
 
@@ -27,3 +31,187 @@ class TestBaseRepositorySoftDelete:
         found = next((u for u in all_records if u.id == sample_user.id), None)
         assert found is not None
         assert found.deleted_at is not None
+
+
+class TestBaseRepositoryBulk:
+    """Bulk writes commit once; update_many/delete_many are one UPDATE."""
+
+    def test_create_many_returns_rows_in_order(self, users_repo, commits, statements):
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(5)
+        )
+        assert [u.username for u in users] == [f"user{i}" for i in range(5)]
+        assert all(u.id is not None for u in users)
+        assert len(commits) == 1
+        # SQLite: one INSERT per row (see create_many), then the reload.
+        assert statements.verbs() == ["INSERT"] * 5 + ["SELECT"]
+
+    def test_create_many_empty(self, users_repo):
+        assert users_repo.create_many([]) == []
+
+    def test_update_many_skips_deleted(self, users_repo, commits, statements):
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(3)
+        )
+        users_repo.delete(users[2].id)
+        ids = [u.id for u in users]
+        commits.clear()
+        statements.clear()
+
+        updated = users_repo.update_many(ids, fname="Bulk")
+        assert statements.verbs() == ["UPDATE", "SELECT"]
+
+        assert [u.id for u in updated] == [users[0].id, users[1].id]
+        assert all(u.fname == "Bulk" for u in updated)
+        assert users_repo.all(id=users[2].id)[0].fname == "Test"
+        assert len(commits) == 1
+
+    def test_delete_many(self, users_repo, commits, statements):
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(3)
+        )
+        ids = [users[0].id, users[1].id, 99999]
+        commits.clear()
+        statements.clear()
+
+        deleted = users_repo.delete_many(ids)
+        assert statements.verbs() == ["UPDATE", "SELECT"]
+
+        assert {u.id for u in deleted} == {users[0].id, users[1].id}
+        assert all(u.deleted_at is not None for u in deleted)
+        assert [u.id for u in users_repo.list()] == [users[2].id]
+        assert len(commits) == 1
+
+
+class TestBaseRepositorySingleStatementWrites:
+    """update/delete/restore compile to one UPDATE ... RETURNING."""
+
+    def test_update_is_one_statement(self, users_repo, sample_user, statements):
+        updated = users_repo.update(sample_user.id, fname="Changed")
+        assert updated.fname == "Changed"
+        assert updated.created_at is not None
+        assert statements.verbs() == ["UPDATE"]
+
+    def test_update_skips_noop_write(self, users_repo, sample_user, statements):
+        same = users_repo.update(sample_user.id, fname=sample_user.fname)
+        assert same.id == sample_user.id
+        assert statements.verbs() == ["UPDATE", "SELECT"]
+        # SQLite reports rows modified by the most recent UPDATE.
+        assert users_repo.db.execute(text("SELECT changes()")).scalar() == 0
+
+    def test_update_missing_returns_none(self, users_repo):
+        assert users_repo.update(99999, fname="X") is None
+
+    def test_delete_and_restore_are_one_statement(self, users_repo, sample_user, statements):
+        deleted = users_repo.delete(sample_user.id)
+        assert deleted.deleted_at is not None
+        restored = users_repo.restore(sample_user.id)
+        assert restored.deleted_at is None
+        assert statements.verbs() == ["UPDATE", "UPDATE"]
+
+    def test_delete_twice_returns_none(self, users_repo, sample_user):
+        users_repo.delete(sample_user.id)
+        assert users_repo.delete(sample_user.id) is None
+        assert users_repo.restore(sample_user.id) is not None
+        assert users_repo.restore(sample_user.id) is None
+
+    def test_update_keeps_pending_changes(self, users_repo, sample_user):
+        with unit_of_work(users_repo.db):
+            sample_user.lname = "Pending"
+            updated = users_repo.update(sample_user.id, fname="Changed")
+
+        assert (updated.fname, updated.lname) == ("Changed", "Pending")
+        assert users_repo.db.execute(text("SELECT lname FROM users")).scalar() == "Pending"
+
+
+class TestBaseRepositoryPagination:
+    """Keyset pagination and batched streaming."""
+
+    @pytest.fixture
+    def users(self, users_repo):
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(7)
+        )
+        users_repo.delete(users[3].id)
+        return users
+
+    def test_list_page_walks_all_active_rows(self, users_repo, users):
+        seen, after_id = [], None
+        while True:
+            page = users_repo.list_page(after_id=after_id, limit=2)
+            seen.extend(u.id for u in page.items)
+            if page.next_after_id is None:
+                break
+            after_id = page.next_after_id
+
+        expected = [u.id for u in users if u.id != users[3].id]
+        assert seen == expected
+
+    def test_list_page_desc_with_filters(self, users_repo, users):
+        page = users_repo.list_page(limit=10, order="desc", fname="Test")
+        assert [u.id for u in page.items] == sorted(
+            (u.id for u in users if u.id != users[3].id), reverse=True
+        )
+        assert page.next_after_id is None
+
+    def test_list_page_rejects_bad_order(self, users_repo):
+        with pytest.raises(ValueError):
+            users_repo.list_page(order="sideways")
+
+    def test_iter_batches(self, users_repo, users):
+        batches = list(users_repo.iter_batches(batch_size=4))
+        assert [len(b) for b in batches] == [4, 2]
+        assert [u.id for b in batches for u in b] == [
+            u.id for u in users if u.id != users[3].id
+        ]
+
+
+class TestBaseRepositoryGetMany:
+    """Batch primary-key fetch."""
+
+    def test_get_many_returns_active_rows_by_id(self, users_repo):
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(3)
+        )
+        users_repo.delete(users[1].id)
+
+        found = users_repo.get_many([users[0].id, users[1].id, users[2].id, 99999])
+
+        assert set(found) == {users[0].id, users[2].id}
+        assert found[users[0].id].username == "user0"
+
+    def test_get_many_chunks_large_lists(self, users_repo, monkeypatch, statements):
+        monkeypatch.setattr(base_repository, "IN_CHUNK_SIZE", 2)
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(5)
+        )
+        users_repo.db.expunge_all()
+
+        statements.clear()
+        found = users_repo.get_many(u.id for u in users)
+
+        assert len(found) == 5
+        assert len(statements) == 3
+
+    def test_bulk_writes_reload_in_chunks(self, users_repo, monkeypatch, statements):
+        monkeypatch.setattr(base_repository, "IN_CHUNK_SIZE", 2)
+        users = users_repo.create_many(
+            make_user_data(username=f"user{i}", email=f"user{i}@ex.com")
+            for i in range(5)
+        )
+        ids = [u.id for u in users]
+
+        statements.clear()
+        deleted = users_repo.delete_many(ids)
+
+        assert sorted(u.id for u in deleted) == ids
+        assert statements.verbs().count("SELECT") == 3
+
+    def test_get_many_empty(self, users_repo):
+        assert users_repo.get_many([]) == {}
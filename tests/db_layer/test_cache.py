@@ -0,0 +1,125 @@
+"""Tests for the opt-in repository read-through cache."""
+import pytest
+from sqlalchemy.orm import Session
+
+from db.crud.cache import ModelCache, disable_cache, enable_cache
+from db.crud.soft_delete import soft_delete
+from db.crud.users import UsersRepository
+from db.models import Users
+from db.unit_of_work import unit_of_work
+
+from tests.conftest import make_user_data
+
+
+@pytest.fixture
+def users_cache():
+    cache = enable_cache(Users, maxsize=10, ttl=60)
+    yield cache
+    disable_cache(Users)
+
+
+class TestModelCache:
+    """LRU + TTL behaviour."""
+
+    def test_lru_eviction(self):
+        cache = ModelCache(maxsize=2, ttl=60)
+        cache.set(1, {"id": 1})
+        cache.set(2, {"id": 2})
+        cache.get(1)
+        cache.set(3, {"id": 3})
+        assert cache.get(2) is None
+        assert cache.get(1) == {"id": 1}
+
+    def test_ttl_expiry(self):
+        now = [0.0]
+        cache = ModelCache(maxsize=2, ttl=5, clock=lambda: now[0])
+        cache.set(1, {"id": 1})
+        now[0] = 6.0
+        assert cache.get(1) is None
+        assert cache.stats()["misses"] == 1
+
+
+class TestRepositoryCache:
+    """BaseRepository.get served from the cache and invalidated by writes."""
+
+    def test_hit_skips_select_across_sessions(
+        self, users_repo, sample_user, users_cache, engine, statements
+    ):
+        users_repo.get(sample_user.id)
+        with Session(engine) as other:
+            statements.clear()
+            user = UsersRepository(other).get(sample_user.id)
+            assert user.username == sample_user.username
+            assert user in other
+        assert statements == []
+        assert users_cache.stats()["hits"] == 1
+
+    def test_update_invalidates(self, users_repo, sample_user, users_cache):
+        users_repo.get(sample_user.id)
+        users_repo.update(sample_user.id, fname="Changed")
+        users_repo.db.expunge_all()
+        assert users_repo.get(sample_user.id).fname == "Changed"
+
+    def test_delete_and_restore_invalidate(self, users_repo, sample_user, users_cache):
+        users_repo.get(sample_user.id)
+        users_repo.delete(sample_user.id)
+        users_repo.db.expunge_all()
+        assert users_repo.get(sample_user.id) is None
+        users_repo.restore(sample_user.id)
+        assert users_repo.get(sample_user.id) is not None
+
+    def test_soft_delete_helper_invalidates(self, users_repo, sample_user, users_cache):
+        users_repo.get(sample_user.id)
+        soft_delete(users_repo.db, Users, sample_user.id)
+        users_repo.db.expunge_all()
+        assert users_repo.get(sample_user.id) is None
+
+    def test_orm_flush_invalidates(self, users_repo, sample_user, users_cache):
+        user_id = sample_user.id
+        user = users_repo.get(user_id)
+        user.fname = "Direct"
+        users_repo.db.commit()
+        users_repo.db.expunge_all()
+        assert users_repo.get(user_id).fname == "Direct"
+
+    def test_disabled_by_default(self, users_repo, sample_user, statements):
+        users_repo.db.expunge_all()
+        users_repo.get(sample_user.id)
+        users_repo.db.expunge_all()
+        users_repo.get(sample_user.id)
+        assert len(statements) == 2
+
+    def test_get_many_uses_cache(self, users_repo, sample_user, users_cache, statements):
+        other = users_repo.create(**make_user_data(username="other", email="o@ex.com"))
+        users_repo.get(sample_user.id)
+        users_repo.db.expunge_all()
+        statements.clear()
+
+        found = users_repo.get_many([sample_user.id, other.id])
+
+        assert set(found) == {sample_user.id, other.id}
+        assert len(statements) == 1
+        assert users_cache.get(other.id) is not None
+
+    def test_uncommitted_row_is_not_cached(self, users_repo, sample_user, users_cache, engine):
+        user_id, fname = sample_user.id, sample_user.fname
+
+        with pytest.raises(RuntimeError):
+            with unit_of_work(users_repo.db):
+                users_repo.update(user_id, fname="UNCOMMITTED")
+                assert users_repo.get(user_id).fname == "UNCOMMITTED"
+                # Other sessions would be served this entry.
+                assert users_cache.get(user_id) is None
+                raise RuntimeError("roll back")
+
+        with Session(engine) as other:
+            assert UsersRepository(other).get(user_id).fname == fname
+
+    def test_uncommitted_insert_is_not_cached(self, users_repo, users_cache):
+        with pytest.raises(RuntimeError):
+            with unit_of_work(users_repo.db):
+                user = users_repo.create(**make_user_data())
+                user_id = user.id
+                assert users_repo.get_many([user_id])
+                assert users_cache.get(user_id) is None
+                raise RuntimeError("roll back")
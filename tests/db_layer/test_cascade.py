@@ -0,0 +1,94 @@
+"""Tests for the set-based cascade soft delete engine."""
+import pytest
+
+from db.crud.cascade import cascade_restore, cascade_soft_delete
+from db.models import ChatHistory, Scenarios
+
+
+@pytest.fixture
+def scenario_graph(
+    sample_scenario,
+    stakeholders_repo,
+    chat_history_repo,
+    chat_message_repo,
+    requirements_repo,
+    feedback_repo,
+    categories_repo,
+    scenario_categories_repo,
+):
+    st = stakeholders_repo.create(
+        scenario_id=sample_scenario.id, name="S", role="R", prompt="P"
+    )
+    h = chat_history_repo.create(stakeholder_id=st.id)
+    messages = chat_message_repo.create_many(
+        {"chat_history_id": h.id, "sent_by": "User", "message": f"M{i}"}
+        for i in range(20)
+    )
+    req = requirements_repo.create(
+        scenario_id=sample_scenario.id, type="functional", requirement="R1"
+    )
+    feedback_repo.create(
+        feedback="On message", scenario_id=sample_scenario.id, chat_message_id=messages[0].id
+    )
+    feedback_repo.create(
+        feedback="On requirement", scenario_id=sample_scenario.id, requirement_id=req.id
+    )
+    category = categories_repo.create(name="Cat")
+    scenario_categories_repo.create(scenario_id=sample_scenario.id, category_id=category.id)
+    return {"scenario": sample_scenario, "stakeholder": st, "history": h, "messages": messages}
+
+
+class TestCascadeSoftDelete:
+    """Cascade soft delete / restore across the scenario graph."""
+
+    def test_deletes_whole_graph_with_one_update_per_table(
+        self, db_session, scenario_graph, chat_message_repo, feedback_repo, statements
+    ):
+        scenario_id = scenario_graph["scenario"].id
+        statements.clear()
+
+        counts = cascade_soft_delete(db_session, Scenarios, [scenario_id])
+
+        assert counts == {
+            "feedback_reference": 2,
+            "chat_message": 20,
+            "chat_history": 1,
+            "stakeholder": 1,
+            "requirements": 1,
+            "scenario_categories": 1,
+            "scenarios": 1,
+        }
+        assert statements.verbs().count("UPDATE") == 7
+        assert chat_message_repo.list() == []
+        assert feedback_repo.list() == []
+
+    def test_restore_only_brings_back_cascaded_rows(
+        self, db_session, scenario_graph, chat_message_repo, scenarios_repo
+    ):
+        messages = scenario_graph["messages"]
+        chat_message_repo.delete(messages[1].id)
+
+        cascade_soft_delete(db_session, Scenarios, [scenario_graph["scenario"].id])
+        counts = cascade_restore(db_session, Scenarios, [scenario_graph["scenario"].id])
+
+        assert counts["chat_message"] == 19
+        assert scenarios_repo.get(scenario_graph["scenario"].id) is not None
+        assert chat_message_repo.get(messages[1].id) is None
+        assert chat_message_repo.get(messages[0].id) is not None
+
+    def test_cascade_from_history_leaves_parents(
+        self, db_session, scenario_graph, stakeholders_repo, chat_history_repo
+    ):
+        counts = cascade_soft_delete(db_session, ChatHistory, [scenario_graph["history"].id])
+
+        assert counts["chat_message"] == 20
+        assert counts["feedback_reference"] == 1
+        assert chat_history_repo.get(scenario_graph["history"].id) is None
+        assert stakeholders_repo.get(scenario_graph["stakeholder"].id) is not None
+
+    def test_already_deleted_root_is_noop(self, db_session, scenario_graph):
+        scenario_id = scenario_graph["scenario"].id
+        cascade_soft_delete(db_session, Scenarios, [scenario_id])
+        counts = cascade_soft_delete(db_session, Scenarios, [scenario_id])
+        assert counts["scenarios"] == 0
+        assert counts["chat_message"] == 0
@@ -78,3 +78,46 @@ class TestChatMessageRepository:
         )
         msgs = chat_message_repo.list(chat_history_id=h.id)
         assert len(msgs) == 1
+
+    def test_scenario_ids(
+        self,
+        chat_message_repo,
+        chat_history_repo,
+        stakeholders_repo,
+        sample_scenario,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        msgs = [
+            chat_message_repo.create(chat_history_id=h.id, sent_by="User", message=f"M{i}")
+            for i in range(3)
+        ]
+        chat_message_repo.delete(msgs[2].id)
+
+        found = chat_message_repo.scenario_ids([m.id for m in msgs] + [99999])
+
+        assert found == {msgs[0].id: sample_scenario.id, msgs[1].id: sample_scenario.id}
+
+    def test_scenario_ids_unreachable_scenario(
+        self,
+        chat_message_repo,
+        chat_history_repo,
+        stakeholders_repo,
+        sample_scenario,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        msg = chat_message_repo.create(chat_history_id=h.id, sent_by="User", message="Hi")
+        stakeholders_repo.delete(st.id)
+
+        assert chat_message_repo.scenario_ids([msg.id]) == {msg.id: None}
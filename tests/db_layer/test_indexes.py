@@ -0,0 +1,46 @@
+"""Verify hot repository queries are served by the declared indexes."""
+import pytest
+
+
+def query_plan(session, stmt):
+    sql = str(stmt.compile(session.get_bind(), compile_kwargs={"literal_binds": True}))
+    rows = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+class TestHotQueryIndexes:
+    """EXPLAIN QUERY PLAN uses the partial/composite indexes."""
+
+    @pytest.mark.parametrize(
+        "repo_fixture, filters, index",
+        [
+            ("chat_message_repo", {"chat_history_id": 1}, "ix_chat_message_active_history"),
+            ("chat_history_repo", {"stakeholder_id": 1}, "ix_chat_history_active_stakeholder"),
+            ("stakeholders_repo", {"scenario_id": 1}, "ix_stakeholder_active_scenario"),
+            ("requirements_repo", {"scenario_id": 1}, "ix_requirements_active_scenario"),
+            ("feedback_repo", {"scenario_id": 1}, "ix_feedback_reference_active_scenario"),
+            ("feedback_repo", {"requirement_id": 1}, "ix_feedback_reference_active_requirement"),
+            ("feedback_repo", {"chat_message_id": 1}, "ix_feedback_reference_active_chat_message"),
+            ("scenarios_repo", {"owner_id": 1}, "ix_scenarios_active_owner"),
+            ("students_repo", {"user_id": 1}, "ix_students_of_class_active_user"),
+            # Served by the index SQLite builds for uq_students_of_class_class_user.
+            ("students_repo", {"class_id": 1, "user_id": 1}, "(class_id=? AND user_id=?)"),
+            ("class_teacher_repo", {"teacher_id": 1}, "ix_class_teacher_active_teacher"),
+        ],
+    )
+    def test_active_list_uses_index(self, request, db_session, repo_fixture, filters, index):
+        repo = request.getfixturevalue(repo_fixture)
+        stmt = repo._active_select(**filters).order_by(repo.model.id)
+        assert index in query_plan(db_session, stmt)
+
+    def test_keyset_page_avoids_sort(self, db_session, chat_message_repo):
+        model = chat_message_repo.model
+        stmt = (
+            chat_message_repo._active_select(chat_history_id=1)
+            .where(model.id > 10)
+            .order_by(model.id)
+            .limit(51)
+        )
+        plan = query_plan(db_session, stmt)
+        assert "ix_chat_message_active_history" in plan
+        assert "TEMP B-TREE" not in plan
@@ -0,0 +1,95 @@
+"""Tests for the instrumented connection pool."""
+import importlib
+import sys
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from db.pool import InstrumentedQueuePool, pool_stats
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentedQueuePool:
+    """Checkout waits, timeouts and gauges are reported."""
+
+    def test_records_checkouts(self, pooled_engine):
+        for _ in range(3):
+            with pooled_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = pool_stats(pooled_engine)
+        assert stats["checkouts"] == 3
+        assert stats["wait_histogram"]["le_inf"] == 3
+        assert stats["in_use"] == 0
+        assert stats["idle"] == 1
+
+    def test_gauges_track_in_use_and_overflow(self, pooled_engine):
+        first = pooled_engine.connect()
+        second = pooled_engine.connect()
+        try:
+            stats = pool_stats(pooled_engine)
+            assert stats["in_use"] == 2
+            assert stats["overflow"] == 1
+        finally:
+            first.close()
+            second.close()
+
+    def test_counts_timeouts(self, pooled_engine):
+        held = [pooled_engine.connect(), pooled_engine.connect()]
+        try:
+            with pytest.raises(exc.TimeoutError):
+                pooled_engine.connect()
+        finally:
+            for conn in held:
+                conn.close()
+
+        stats = pool_stats(pooled_engine)
+        assert stats["timeouts"] == 1
+        assert stats["checkouts"] == 2
+
+    def test_uninstrumented_engine_has_no_stats(self, engine):
+        assert pool_stats(engine) is None
+        assert pool_stats(None) is None
+
+
+
+@pytest.fixture
+def session_module(monkeypatch, tmp_path):
+    """db.session imported fresh against a SQLite DATABASE_URL."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'session.db'}")
+    saved = {name: sys.modules.pop(name, None) for name in ("db.config", "db.session")}
+    try:
+        yield importlib.import_module("db.session")
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+class TestAsyncEnginePool:
+    """The async engine is pooled with the same settings as the sync engine."""
+
+    def test_uses_pool_settings(self, session_module, async_runner):
+        config = sys.modules["db.config"]
+        engine = session_module.get_async_engine()
+        try:
+            pool = engine.sync_engine.pool
+            assert pool.size() == config.POOL_SIZE
+            assert pool._max_overflow == config.MAX_OVERFLOW
+            assert pool._timeout == config.POOL_TIMEOUT
+        finally:
+            async_runner.run(engine.dispose())
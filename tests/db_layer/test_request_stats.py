@@ -0,0 +1,63 @@
+"""Tests for per-request session I/O accounting."""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from db.crud.cache import disable_cache, enable_cache
+from db.crud.users import UsersRepository
+from db.models import Users
+from db.request_stats import request_session, request_stats
+
+from tests.conftest import make_user_data
+
+
+@pytest.fixture
+def factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def users_cache():
+    cache = enable_cache(Users)
+    yield cache
+    disable_cache(Users)
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    request_stats.reset()
+    yield
+    request_stats.reset()
+
+
+def _handle(factory, handler):
+    """Run `handler` the way FastAPI drives the get_db generator."""
+    sessions = request_session(factory)
+    db = next(sessions)
+    try:
+        return handler(db)
+    finally:
+        sessions.close()
+
+
+class TestRequestSession:
+    """Requests that never execute SQL never check out a connection."""
+
+    def test_request_without_sql_is_zero_io(self, factory):
+        _handle(factory, lambda db: None)
+
+        assert request_stats.stats() == {"requests": 1, "zero_io": 1, "with_io": 0}
+
+    def test_request_with_sql_is_counted(self, factory):
+        _handle(factory, lambda db: UsersRepository(db).list())
+
+        assert request_stats.stats() == {"requests": 1, "zero_io": 0, "with_io": 1}
+
+    def test_cached_get_is_zero_io(self, factory, users_cache):
+        user_id = _handle(factory, lambda db: UsersRepository(db).create(**make_user_data()).id)
+        _handle(factory, lambda db: UsersRepository(db).get(user_id))
+        request_stats.reset()
+
+        user = _handle(factory, lambda db: UsersRepository(db).get(user_id))
+
+        assert user.id == user_id
+        assert request_stats.stats()["zero_io"] == 1
@@ -0,0 +1,185 @@
+"""Tests for primary/replica routing with read-your-writes stickiness."""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from db.crud.cache import disable_cache, enable_cache
+from db.crud.cascade import cascade_restore
+from db.crud.users import UsersRepository
+from db.models import Base, Scenarios, Users
+from db.routing import RoutingSession, is_sticky, on_first_write, stick_to_primary
+
+from tests.conftest import make_user_data
+
+
+@pytest.fixture
+def primary(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def make_session(primary, replica):
+    factory = sessionmaker(
+        class_=RoutingSession,
+        autoflush=False,
+        bind=primary,
+        replica_bind=replica,
+    )
+    sessions = []
+
+    def make():
+        session = factory()
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+
+
+def _seed(engine, **overrides):
+    """Insert a user directly into one database."""
+    with engine.begin() as conn:
+        conn.execute(Users.__table__.insert().values(**make_user_data(**overrides)))
+
+
+class TestRoutingSession:
+    """Reads hit the replica until the session writes."""
+
+    def test_reads_go_to_replica(self, make_session, primary, replica):
+        _seed(replica, email="replica@test.com")
+        session = make_session()
+
+        emails = session.scalars(select(Users.email)).all()
+
+        assert emails == ["replica@test.com"]
+        assert not is_sticky(session)
+
+    def test_write_goes_to_primary(self, make_session, primary, replica):
+        session = make_session()
+        UsersRepository(session).create(**make_user_data())
+
+        with primary.connect() as conn:
+            assert conn.scalar(text("SELECT count(*) FROM users")) == 1
+        with replica.connect() as conn:
+            assert conn.scalar(text("SELECT count(*) FROM users")) == 0
+
+    def test_reads_after_write_stick_to_primary(self, make_session):
+        session = make_session()
+        repo = UsersRepository(session)
+        user = repo.create(**make_user_data())
+        session.expunge_all()
+
+        assert is_sticky(session)
+        assert repo.get(user.id) is not None
+        assert len(repo.list()) == 1
+
+    def test_fresh_session_reads_replica_again(self, make_session):
+        UsersRepository(make_session()).create(**make_user_data())
+
+        assert UsersRepository(make_session()).list() == []
+
+    def test_explicit_stick_to_primary(self, make_session, primary):
+        _seed(primary)
+        session = make_session()
+        stick_to_primary(session)
+
+        assert len(UsersRepository(session).list()) == 1
+
+    def test_locking_select_uses_primary(self, make_session, primary):
+        _seed(primary)
+        session = make_session()
+
+        rows = session.scalars(select(Users).with_for_update()).all()
+
+        assert len(rows) == 1
+        assert is_sticky(session)
+
+    def test_on_first_write_fires_once(self, make_session):
+        session = make_session()
+        calls = []
+        on_first_write(session, lambda: calls.append(1))
+        repo = UsersRepository(session)
+
+        repo.list()
+        assert calls == []
+        repo.create(**make_user_data())
+        repo.create(**make_user_data(email="second@test.com", username="second"))
+        assert calls == [1]
+
+    def test_without_replica_everything_uses_bind(self, primary):
+        session = RoutingSession(bind=primary)
+        UsersRepository(session).create(**make_user_data())
+
+        assert len(UsersRepository(session).list()) == 1
+        session.close()
+
+
+class TestRoutingCache:
+    """Replica reads and primary-pinned sessions never fill the row cache."""
+
+    @pytest.fixture
+    def users_cache(self):
+        cache = enable_cache(Users, maxsize=10, ttl=60)
+        yield cache
+        disable_cache(Users)
+
+    def test_replica_read_is_not_cached(self, make_session, replica, users_cache):
+        _seed(replica)
+        session = make_session()
+        user_id = session.scalars(select(Users.id)).one()
+
+        assert UsersRepository(session).get(user_id) is not None
+        assert users_cache.get(user_id) is None
+
+    def test_sticky_read_is_not_cached(self, make_session, primary, users_cache):
+        _seed(primary)
+        session = make_session()
+        stick_to_primary(session)
+        user_id = session.scalars(select(Users.id)).one()
+
+        assert UsersRepository(session).get(user_id) is not None
+        assert users_cache.get(user_id) is None
+
+    def test_plain_session_still_caches(self, primary, users_cache):
+        _seed(primary)
+        session = RoutingSession(bind=primary)
+        user_id = session.scalars(select(Users.id)).one()
+
+        UsersRepository(session).get(user_id)
+        session.close()
+        assert users_cache.get(user_id) is not None
+
+
+class TestRoutingCascade:
+    """Cascades read the rows they act on from the primary."""
+
+    def test_restore_reads_roots_from_primary(self, make_session, primary):
+        # The replica has not seen the delete (nor the scenario) yet.
+        _seed(primary)
+        with primary.begin() as conn:
+            conn.execute(
+                Scenarios.__table__.insert().values(
+                    id=1, owner_id=1, title="S", deleted_at=datetime.now(timezone.utc)
+                )
+            )
+        session = make_session()
+
+        counts = cascade_restore(session, Scenarios, [1])
+
+        assert counts["scenarios"] == 1
+        with primary.connect() as conn:
+            assert conn.scalar(select(Scenarios.deleted_at)) is None
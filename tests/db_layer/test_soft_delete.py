@@ -0,0 +1,82 @@
+"""Tests for db/crud/soft_delete.py: bulk helpers and the global soft-delete filter."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from db.crud.soft_delete import restore_many, soft_delete_many, soft_delete_where, with_deleted
+from db.models import Scenarios, Stakeholder, Users
+
+from tests.conftest import make_user_data
+
+
+@pytest.fixture
+def users(users_repo):
+    return users_repo.create_many(
+        make_user_data(username=f"user{i}", email=f"user{i}@ex.com", fname=f"F{i % 2}")
+        for i in range(4)
+    )
+
+
+class TestBulkSoftDelete:
+    """soft_delete_many / restore_many / soft_delete_where."""
+
+    def test_soft_delete_many_returns_deleted_ids(self, db_session, users_repo, users):
+        ids = soft_delete_many(db_session, Users, [users[0].id, users[1].id, 99999])
+        assert sorted(ids) == [users[0].id, users[1].id]
+        assert {u.id for u in users_repo.list()} == {users[2].id, users[3].id}
+
+    def test_soft_delete_many_skips_already_deleted(self, db_session, users):
+        soft_delete_many(db_session, Users, [users[0].id])
+        assert soft_delete_many(db_session, Users, [users[0].id]) == []
+
+    def test_restore_many(self, db_session, users_repo, users):
+        soft_delete_many(db_session, Users, [u.id for u in users])
+        ids = restore_many(db_session, Users, [users[0].id, users[1].id])
+        assert sorted(ids) == [users[0].id, users[1].id]
+        assert len(users_repo.list()) == 2
+
+    def test_soft_delete_where(self, db_session, users_repo, users):
+        ids = soft_delete_where(db_session, Users, fname="F0")
+        assert sorted(ids) == [users[0].id, users[2].id]
+        assert {u.fname for u in users_repo.list()} == {"F1"}
+
+    def test_empty_ids(self, db_session):
+        assert soft_delete_many(db_session, Users, []) == []
+        assert restore_many(db_session, Users, []) == []
+
+
+class TestSoftDeleteFilter:
+    """ORM selects and relationship loads skip deleted rows unless opted out."""
+
+    @pytest.fixture
+    def scenario_id(self, db_session, stakeholders_repo, sample_scenario):
+        scenario_id = sample_scenario.id
+        for name in ("A", "B", "C"):
+            stakeholders_repo.create(scenario_id=scenario_id, name=name, role="R", prompt="")
+        first = stakeholders_repo.list(scenario_id=scenario_id)[0]
+        stakeholders_repo.delete(first.id)
+        db_session.expunge_all()
+        return scenario_id
+
+    def test_lazy_load_excludes_deleted(self, db_session, scenario_id):
+        scenario = db_session.get(Scenarios, scenario_id)
+        assert sorted(s.name for s in scenario.stakeholders) == ["B", "C"]
+
+    def test_eager_load_excludes_deleted(self, db_session, scenario_id):
+        scenario = db_session.scalars(
+            select(Scenarios).options(selectinload(Scenarios.stakeholders))
+        ).one()
+        assert len(scenario.stakeholders) == 2
+
+    def test_plain_select_excludes_deleted(self, db_session, scenario_id):
+        assert len(db_session.scalars(select(Stakeholder)).all()) == 2
+        assert len(db_session.query(Stakeholder).all()) == 2
+
+    def test_with_deleted_escape_hatch(self, db_session, scenario_id):
+        assert len(db_session.scalars(with_deleted(select(Stakeholder))).all()) == 3
+        assert len(with_deleted(db_session.query(Stakeholder)).all()) == 3
+
+    def test_refresh_of_deleted_object(self, db_session, stakeholders_repo, scenario_id):
+        deleted = stakeholders_repo.all(name="A")[0]
+        db_session.expire(deleted)
+        assert deleted.deleted_at is not None
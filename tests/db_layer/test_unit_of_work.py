@@ -0,0 +1,41 @@
+"""Tests for the unit-of-work transaction scope."""
+import pytest
+
+from db.unit_of_work import in_unit_of_work, unit_of_work
+
+from tests.conftest import make_user_data
+
+
+class TestUnitOfWork:
+    """Repository writes inside a unit of work commit once."""
+
+    def test_writes_commit_once(self, users_repo, class_repo, db_session, commits):
+        with unit_of_work(db_session):
+            assert in_unit_of_work(db_session)
+            user = users_repo.create(**make_user_data())
+            users_repo.update(user.id, fname="Changed")
+            class_repo.create(name="Class")
+            assert commits == []
+
+        assert not in_unit_of_work(db_session)
+        assert len(commits) == 1
+        assert users_repo.get(user.id).fname == "Changed"
+
+    def test_rolls_back_on_error(self, users_repo, db_session, commits):
+        with pytest.raises(RuntimeError):
+            with unit_of_work(db_session):
+                users_repo.create(**make_user_data())
+                raise RuntimeError("boom")
+
+        assert commits == []
+        assert users_repo.all() == []
+
+    def test_nested_scopes_join_outer_transaction(self, users_repo, db_session, commits):
+        with unit_of_work(db_session):
+            with unit_of_work(db_session):
+                users_repo.create(**make_user_data())
+            assert commits == []
+            assert in_unit_of_work(db_session)
+
+        assert len(commits) == 1
+        assert len(users_repo.list()) == 1
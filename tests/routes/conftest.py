@@ -0,0 +1,97 @@
+"""Fixtures for route tests: the routers served in-process over the test session."""
+import importlib
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from db.crud.classes import ClassRepository
+from db.crud.scenarios import ScenariosRepository
+from db.crud.users import ClassTeacherRepository, StudentsOfClassRepository, UsersRepository
+from db.models import Base
+from tests.conftest import TEST_DATABASE_URL, make_user_data
+
+# Modules that read DATABASE_URL (directly or through db.session) at import.
+ROUTE_MODULES = (
+    "db.config",
+    "db.session",
+    "app.helpers.dependencies",
+    "app.routes.feedback",
+    "app.routes.users",
+)
+
+
+@pytest.fixture
+def engine():
+    """
+    In-memory engine with a single shared connection: TestClient runs sync
+    routes on a worker thread, which must see the same database.
+    """
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def teacher(db_session):
+    return UsersRepository(db_session).create(**make_user_data())
+
+
+@pytest.fixture
+def class_id(db_session, teacher):
+    class_id = ClassRepository(db_session).create(name="Test Class").id
+    ClassTeacherRepository(db_session).create(class_id=class_id, teacher_id=teacher.id)
+    return class_id
+
+
+@pytest.fixture
+def student(db_session, class_id):
+    student = UsersRepository(db_session).create(
+        **make_user_data(username="student", email="student@example.com")
+    )
+    StudentsOfClassRepository(db_session).create(class_id=class_id, user_id=student.id)
+    return student
+
+
+@pytest.fixture
+def scenario_id(db_session, student):
+    """A scenario owned by a student of the teacher's class."""
+    return ScenariosRepository(db_session).create(owner_id=student.id, title="Scenario").id
+
+
+@pytest.fixture
+def request_db(db_session):
+    """Session the routes are served with."""
+    return db_session
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, request_db, teacher):
+    """Client for the feedback and users routers, signed in as `teacher`."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'routes.db'}")
+    saved = {name: sys.modules.pop(name, None) for name in ROUTE_MODULES}
+    try:
+        session = importlib.import_module("db.session")
+        dependencies = importlib.import_module("app.helpers.dependencies")
+        app = FastAPI()
+        for name in ("feedback", "users"):
+            app.include_router(importlib.import_module(f"app.routes.{name}").router)
+        app.dependency_overrides[session.get_db] = lambda: request_db
+        app.dependency_overrides[dependencies.get_current_user] = lambda: teacher
+        with TestClient(app) as client:
+            yield client
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -0,0 +1,47 @@
+"""Routes read from the replica until the client has recently written."""
+import time
+
+import pytest
+
+from db.routing import RoutingSession, is_sticky
+
+# app.helpers.dependencies.PRIMARY_UNTIL_HEADER; importing it needs DATABASE_URL.
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+
+@pytest.fixture
+def request_db(engine):
+    # The test engine doubles as the replica so reads are routed for real.
+    session = RoutingSession(bind=engine, replica_bind=engine, autoflush=False)
+    yield session
+    session.close()
+
+
+class TestReadYourWrites:
+    def test_write_returns_primary_token(self, client, scenario_id):
+        response = client.post(
+            "/feedback/batch", json=[{"feedback": "F", "scenario_id": scenario_id}]
+        )
+
+        assert response.status_code == 200
+        assert float(response.headers[PRIMARY_UNTIL_HEADER]) > time.time()
+
+    def test_read_only_request_uses_replica(self, client, request_db, class_id):
+        response = client.post(
+            "/users/import", params={"class_id": class_id + 1}, files={"file": ("r.csv", b"")}
+        )
+
+        assert response.status_code == 403
+        assert PRIMARY_UNTIL_HEADER not in response.headers
+        assert not is_sticky(request_db)
+
+    def test_token_pins_reads_to_primary(self, client, request_db, class_id):
+        response = client.post(
+            "/users/import",
+            params={"class_id": class_id + 1},
+            files={"file": ("r.csv", b"")},
+            headers={PRIMARY_UNTIL_HEADER: str(time.time() + 5)},
+        )
+
+        assert response.status_code == 403
+        assert is_sticky(request_db)
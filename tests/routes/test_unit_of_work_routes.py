@@ -0,0 +1,131 @@
+"""Multi-write routes run the whole request in one unit of work."""
+import pytest
+from sqlalchemy import func, select
+
+import app.helpers.security as security
+from db.crud.classes import ClassRepository
+from db.crud.scenarios import ScenariosRepository
+from db.crud.users import UsersRepository
+from db.models import FeedbackReference, StudentsOfClass, Users
+from tests.conftest import make_user_data
+
+HEADER = "fname,lname,username,email,password\n"
+
+
+def roster(count):
+    rows = (f"Student,{i},student{i},student{i}@example.com,pw{i}\n" for i in range(count))
+    return (HEADER + "".join(rows)).encode()
+
+
+def count(db_session, model):
+    return db_session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.fixture
+def fast_hash(monkeypatch):
+    monkeypatch.setattr(security.pwd_context, "hash", lambda password: "hashed:" + password)
+
+
+class TestFeedbackBatchRoute:
+    def test_commits_once(self, client, commits, scenario_id):
+        items = [{"feedback": f"F{i}", "scenario_id": scenario_id} for i in range(3)]
+
+        commits.clear()
+        response = client.post("/feedback/batch", json=items)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        assert len(commits) == 1
+
+    def test_invalid_batch_commits_nothing(self, client, commits, db_session, scenario_id):
+        items = [{"feedback": "F", "scenario_id": scenario_id}, {"feedback": ""}]
+
+        commits.clear()
+        response = client.post("/feedback/batch", json=items)
+
+        assert response.status_code == 400
+        assert commits == []
+        assert count(db_session, FeedbackReference) == 0
+
+    def test_non_teacher_is_forbidden(self, client, db_session, class_id):
+        outsider = UsersRepository(db_session).create(
+            **make_user_data(username="outsider", email="outsider@example.com")
+        )
+        scenario_id = ScenariosRepository(db_session).create(owner_id=outsider.id, title="S").id
+        items = [{"feedback": f"F{i}", "scenario_id": scenario_id} for i in range(20)]
+
+        response = client.post("/feedback/batch", json=items)
+
+        assert response.status_code == 403
+        assert count(db_session, FeedbackReference) == 0
+
+    def test_own_scenario_is_forbidden(self, client, db_session, teacher, scenario_id):
+        own_id = ScenariosRepository(db_session).create(owner_id=teacher.id, title="Own").id
+        items = [
+            {"feedback": "F", "scenario_id": scenario_id},
+            {"feedback": "F", "scenario_id": own_id},
+        ]
+
+        response = client.post("/feedback/batch", json=items)
+
+        assert response.status_code == 403
+        assert count(db_session, FeedbackReference) == 0
+
+
+class TestRosterImportRoute:
+    def test_commits_once_across_chunks(self, client, commits, db_session, class_id, fast_hash):
+        commits.clear()
+        response = client.post(
+            "/users/import",
+            params={"class_id": class_id},
+            files={"file": ("roster.csv", roster(501))},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 501
+        assert len(commits) == 1
+
+    def test_failure_in_a_later_chunk_rolls_back_the_request(
+        self, client, commits, db_session, class_id, fast_hash
+    ):
+        # Well past the first chunk so the bad byte is decoded after it was written.
+        payload = roster(700) + b"Bad,\xff,bad,bad@example.com,pw\n"
+
+        commits.clear()
+        response = client.post(
+            "/users/import",
+            params={"class_id": class_id},
+            files={"file": ("roster.csv", payload)},
+        )
+
+        assert response.status_code == 400
+        assert commits == []
+        assert count(db_session, Users) == 1
+
+    def test_non_teacher_is_forbidden(self, client, db_session, fast_hash):
+        other_class = ClassRepository(db_session).create(name="Other").id
+
+        response = client.post(
+            "/users/import",
+            params={"class_id": other_class},
+            files={"file": ("roster.csv", roster(1))},
+        )
+
+        assert response.status_code == 403
+        assert count(db_session, Users) == 1
+
+    def test_existing_account_is_not_enrolled(self, client, db_session, class_id, fast_hash):
+        # The roster row matches the existing account's username and email.
+        UsersRepository(db_session).create(
+            **make_user_data(username="student0", email="student0@example.com")
+        )
+
+        response = client.post(
+            "/users/import",
+            params={"class_id": class_id},
+            files={"file": ("roster.csv", roster(1))},
+        )
+
+        assert response.status_code == 200
+        assert (response.json()["enrolled"], response.json()["failed"]) == (0, 1)
+        assert count(db_session, StudentsOfClass) == 0
@@ -13,6 +13,7 @@ from db.crud.scenarios import (
 )
 from db.crud.chats import ChatHistoryRepository, ChatMessageRepository
 from db.crud.feedback import FeedbackReferenceRepository
+from db.crud.marking_stats import MarkingStatsRepository
 
 from app.services.users_service import UsersService
 from app.services.classes_service import ClassesService
@@ -89,6 +90,11 @@ def feedback_repo(db_session):
     return FeedbackReferenceRepository(db_session)
 
 
+@pytest.fixture
+def marking_stats_repo(db_session):
+    return MarkingStatsRepository(db_session)
+
+
 # --- Services ---
 @pytest.fixture
 def users_service(users_repo, students_repo, class_teacher_repo):
@@ -108,6 +114,7 @@ def scenarios_service(
     categories_repo,
     scenario_categories_repo,
     templates_repo,
+    marking_stats_repo,
 ):
     return ScenariosService(
         scenarios_repo,
@@ -116,12 +123,13 @@ def scenarios_service(
         categories_repo,
         scenario_categories_repo,
         templates_repo,
+        marking_stats_repo,
     )
 
 
 @pytest.fixture
-def chats_service(chat_history_repo, chat_message_repo):
-    return ChatsService(chat_history_repo, chat_message_repo)
+def chats_service(chat_history_repo, chat_message_repo, marking_stats_repo):
+    return ChatsService(chat_history_repo, chat_message_repo, marking_stats_repo)
 
 
 @pytest.fixture
@@ -130,12 +138,16 @@ def feedback_service(
     requirements_repo,
     chat_message_repo,
     scenarios_repo,
+    students_repo,
+    marking_stats_repo,
 ):
     return FeedbackService(
         feedback_repo,
         requirements_repo,
         chat_message_repo,
         scenarios_repo,
+        students_repo,
+        marking_stats_repo,
     )
 
 
@@ -0,0 +1,140 @@
+"""Tests for AsyncChatsService against aiosqlite."""
+import pytest
+
+from app.services.async_chats_service import AsyncChatsService
+from db.crud.chats import AsyncChatHistoryRepository, AsyncChatMessageRepository
+from db.crud.marking_stats import MarkingStatsRepository
+from db.models import (
+    ChatHistory,
+    ChatMessage,
+    FeedbackReference,
+    Requirements,
+    ScenarioMarkingStats,
+    Scenarios,
+    Stakeholder,
+    Users,
+)
+
+from tests.conftest import make_user_data
+
+
+@pytest.fixture
+def async_chats_service(async_session):
+    return AsyncChatsService(
+        AsyncChatHistoryRepository(async_session),
+        AsyncChatMessageRepository(async_session),
+        MarkingStatsRepository(async_session.sync_session),
+    )
+
+
+@pytest.fixture
+def stakeholder_id(async_runner, async_session):
+    async def create():
+        user = Users(**make_user_data())
+        async_session.add(user)
+        await async_session.flush()
+        scenario = Scenarios(owner_id=user.id, title="Scenario")
+        async_session.add(scenario)
+        await async_session.flush()
+        stakeholder = Stakeholder(scenario_id=scenario.id, name="S", role="R", prompt="P")
+        async_session.add(stakeholder)
+        await async_session.commit()
+        return stakeholder.id
+
+    return async_runner.run(create())
+
+
+class TestAsyncChatsService:
+    """AsyncChatsService chat flow."""
+
+    def test_chat_flow(self, async_runner, async_chats_service, stakeholder_id):
+        service = async_chats_service
+
+        async def scenario():
+            history = await service.get_history_for_stakeholder(stakeholder_id)
+            assert (await service.get_history_for_stakeholder(stakeholder_id)).id == history.id
+
+            await service.append_message(history.id, sent_by="User", message="Hi")
+            await service.append_message(history.id, sent_by="LLM", message="Hello")
+            assert len(await service.list_messages(history.id)) == 2
+            assert (await service.get_last_message(history.id)).message == "Hello"
+
+            assert await service.clear_history(history.id) == 2
+            assert await service.list_messages(history.id) == []
+
+        async_runner.run(scenario())
+
+    def test_append_to_missing_history_raises(self, async_runner, async_chats_service):
+        with pytest.raises(ValueError, match="not found"):
+            async_runner.run(
+                async_chats_service.append_message(99999, sent_by="User", message="Hi")
+            )
+
+    def test_delete_and_restore_history(self, async_runner, async_chats_service, stakeholder_id):
+        service = async_chats_service
+
+        async def scenario():
+            history = await service.get_history_for_stakeholder(stakeholder_id)
+            message = await service.append_message(history.id, sent_by="User", message="Hi")
+
+            deleted = await service.delete_history(history.id)
+            assert deleted.deleted_at is not None
+            assert await service.get_history(history.id) is None
+
+            await service.restore_history(history.id)
+            messages = await service.list_messages(history.id)
+            assert [m.id for m in messages] == [message.id]
+
+            assert await service.delete_messages([message.id]) == [message.id]
+
+        async_runner.run(scenario())
+
+
+class TestAsyncChatsServiceMarkingStats:
+    """History cascades keep the marking counters in step."""
+
+    @pytest.fixture
+    def history(self, async_runner, async_session, stakeholder_id):
+        async def create():
+            stakeholder = await async_session.get(Stakeholder, stakeholder_id)
+            requirement = Requirements(scenario_id=stakeholder.scenario_id, type="f", requirement="R")
+            history = ChatHistory(stakeholder_id=stakeholder_id)
+            async_session.add_all([requirement, history])
+            await async_session.flush()
+            message = ChatMessage(chat_history_id=history.id, sent_by="User", message="Hi")
+            async_session.add(message)
+            await async_session.flush()
+            async_session.add(FeedbackReference(
+                feedback="x",
+                scenario_id=stakeholder.scenario_id,
+                requirement_id=requirement.id,
+                chat_message_id=message.id,
+            ))
+            await async_session.commit()
+            await async_session.run_sync(
+                lambda db: MarkingStatsRepository(db).recompute([stakeholder.scenario_id])
+            )
+            return history.id, stakeholder.scenario_id
+
+        return async_runner.run(create())
+
+    def _counters(self, async_runner, async_session, scenario_id):
+        async def read():
+            stats = await async_session.get(
+                ScenarioMarkingStats, scenario_id, populate_existing=True
+            )
+            return stats.total_feedback, stats.requirements_with_feedback
+
+        return async_runner.run(read())
+
+    def test_delete_and_restore_history(
+        self, async_runner, async_session, async_chats_service, history
+    ):
+        history_id, scenario_id = history
+        assert self._counters(async_runner, async_session, scenario_id) == (1, 1)
+
+        async_runner.run(async_chats_service.delete_history(history_id))
+        assert self._counters(async_runner, async_session, scenario_id) == (0, 0)
+
+        async_runner.run(async_chats_service.restore_history(history_id))
+        assert self._counters(async_runner, async_session, scenario_id) == (1, 1)
@@ -127,3 +127,78 @@ class TestChatsServiceHistory:
         count = chats_service.clear_history(h.id)
         assert count == 1
         assert len(chats_service.list_messages(h.id)) == 0
+
+    def test_delete_history_commits_once(
+        self,
+        chats_service,
+        chat_history_repo,
+        stakeholders_repo,
+        sample_scenario,
+        commits,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        chats_service.append_message(h.id, sent_by="U", message="M1")
+        chats_service.append_message(h.id, sent_by="U", message="M2")
+
+        commits.clear()
+        chats_service.delete_history(h.id)
+
+        assert len(commits) == 1
+        assert chats_service.get_history(h.id) is None
+        assert chat_history_repo.all(id=h.id)[0].deleted_at is not None
+
+    def test_list_messages_page(
+        self,
+        chats_service,
+        chat_history_repo,
+        stakeholders_repo,
+        sample_scenario,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        for i in range(3):
+            chats_service.append_message(h.id, sent_by="U", message=f"M{i}")
+
+        first = chats_service.list_messages_page(h.id, limit=2)
+        assert [m.message for m in first.items] == ["M0", "M1"]
+        second = chats_service.list_messages_page(h.id, after_id=first.next_after_id, limit=2)
+        assert [m.message for m in second.items] == ["M2"]
+        assert second.next_after_id is None
+
+    def test_delete_messages_is_one_statement(
+        self,
+        chats_service,
+        chat_history_repo,
+        stakeholders_repo,
+        sample_scenario,
+        statements,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        ids = [
+            chats_service.append_message(h.id, sent_by="U", message=f"M{i}").id
+            for i in range(3)
+        ]
+
+        statements.clear()
+        deleted = chats_service.delete_messages(ids[:2])
+
+        assert sorted(deleted) == ids[:2]
+        assert statements.verbs().count("UPDATE") == 1
+        assert [m.id for m in chats_service.list_messages(h.id)] == [ids[2]]
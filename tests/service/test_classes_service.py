@@ -75,6 +75,13 @@ class TestClassesServiceTeacherMembership:
         teachers = classes_service.list_teachers(sample_class.id)
         assert len(teachers) == 1
 
+    def test_is_teacher(self, classes_service, sample_class, sample_user):
+        assert not classes_service.is_teacher(sample_class.id, sample_user.id)
+        classes_service.add_teacher(sample_class.id, sample_user.id)
+        assert classes_service.is_teacher(sample_class.id, sample_user.id)
+        classes_service.remove_teacher(sample_class.id, sample_user.id)
+        assert not classes_service.is_teacher(sample_class.id, sample_user.id)
+
     def test_remove_teacher(
         self, classes_service, sample_class, sample_user
     ):
@@ -85,3 +92,45 @@ class TestClassesServiceTeacherMembership:
         assert result is not None
         teachers = classes_service.list_teachers(sample_class.id)
         assert len(teachers) == 0
+
+
+class TestClassesServiceBulkEnroll:
+    """add_students enrolls a roster with one upsert."""
+
+    @pytest.fixture
+    def user_ids(self, users_repo):
+        return [
+            users_repo.create(
+                fname="Student",
+                lname=str(i),
+                username=f"student{i}",
+                email=f"student{i}@example.com",
+                password_hash="x",
+            ).id
+            for i in range(5)
+        ]
+
+    def test_one_statement_per_roster(
+        self, classes_service, sample_class, user_ids, statements
+    ):
+        class_id = sample_class.id
+
+        statements.clear()
+        memberships = classes_service.add_students(class_id, user_ids)
+
+        assert [m.user_id for m in memberships] == user_ids
+        assert all(m.id is not None and m.deleted_at is None for m in memberships)
+        assert statements.verbs() == ["INSERT"]
+
+    def test_restores_and_keeps_existing(self, classes_service, sample_class, user_ids):
+        active = classes_service.add_student(sample_class.id, user_ids[0])
+        removed = classes_service.add_student(sample_class.id, user_ids[1])
+        classes_service.remove_student(sample_class.id, user_ids[1])
+
+        memberships = classes_service.add_students(sample_class.id, user_ids + user_ids[:1])
+
+        assert [m.user_id for m in memberships] == user_ids
+        assert memberships[0].id == active.id
+        assert memberships[1].id == removed.id
+        assert memberships[1].deleted_at is None
+        assert len(classes_service.list_students(sample_class.id)) == len(user_ids)
@@ -1,6 +1,9 @@
 """Tests for FeedbackService."""
 import pytest
 
+from app.services.feedback_service import FeedbackService
+from tests.conftest import make_user_data
+
 
 class TestFeedbackServiceCreation:
     """FeedbackService feedback creation."""
@@ -58,6 +61,62 @@ class TestFeedbackServiceCreation:
         )
         assert f.chat_message_id == msg.id
 
+    def test_add_feedback_to_message_resolves_scenario_in_one_query(
+        self,
+        feedback_service,
+        chat_history_repo,
+        chat_message_repo,
+        stakeholders_repo,
+        sample_scenario,
+        statements,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        msg = chat_message_repo.create(
+            chat_history_id=h.id,
+            sent_by="User",
+            message="Hello",
+        )
+        scenario_id = sample_scenario.id
+        chat_message_repo.db.expunge_all()
+
+        statements.clear()
+        f = feedback_service.add_feedback_to_message(msg.id, "Feedback")
+
+        assert statements.verbs().count("SELECT") == 1
+        assert f.scenario_id == scenario_id
+
+    def test_resolve_message_scenarios_batch(
+        self,
+        feedback_service,
+        chat_history_repo,
+        chat_message_repo,
+        stakeholders_repo,
+        sample_scenario,
+    ):
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id,
+            name="S",
+            role="R",
+            prompt="P",
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        ids = [
+            chat_message_repo.create(chat_history_id=h.id, sent_by="User", message=f"M{i}").id
+            for i in range(5)
+        ]
+
+        resolved = feedback_service._resolve_message_scenarios(ids)
+        assert resolved == {id: sample_scenario.id for id in ids}
+
+        with pytest.raises(ValueError):
+            feedback_service._resolve_message_scenarios(ids + [99999])
+
 
 class TestFeedbackServiceRetrieval:
     """FeedbackService retrieval."""
@@ -118,6 +177,62 @@ class TestFeedbackServiceMarking:
         assert summary["coverage"]["total_requirements"] == 1
         assert summary["coverage"]["requirements_with_feedback"] == 1
 
+    def test_compute_marking_summary_counts(
+        self,
+        feedback_service,
+        sample_scenario,
+        requirements_repo,
+        stakeholders_repo,
+        chat_history_repo,
+        chat_message_repo,
+        statements,
+    ):
+        reqs = [
+            requirements_repo.create(
+                scenario_id=sample_scenario.id, type="functional", requirement=f"R{i}"
+            )
+            for i in range(3)
+        ]
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id, name="S", role="R", prompt="P"
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        msg = chat_message_repo.create(chat_history_id=h.id, sent_by="User", message="Hi")
+        created = feedback_service.add_feedback_batch([
+            {"feedback": "a", "requirement_id": reqs[0].id},
+            {"feedback": "b", "requirement_id": reqs[0].id},
+            {"feedback": "c", "requirement_id": reqs[1].id},
+            {"feedback": "d", "chat_message_id": msg.id},
+            {"feedback": "e", "scenario_id": sample_scenario.id},
+        ])
+        feedback_service.delete_feedback(created[2].id)
+        requirements_repo.delete(reqs[2].id)
+        scenario_id, req_id, msg_id = sample_scenario.id, reqs[0].id, msg.id
+
+        statements.clear()
+        summary = feedback_service.compute_marking_summary(scenario_id)
+
+        assert summary == {
+            "total_feedback": 4,
+            "per_requirement": {req_id: 2},
+            "per_chat_message": {msg_id: 1},
+            "coverage": {
+                "total_requirements": 2,
+                "requirements_with_feedback": 1,
+                "coverage_ratio": 0.5,
+            },
+        }
+        assert len(statements) == 2
+
+    def test_compute_marking_summary_without_requirements(self, feedback_service, sample_scenario):
+        summary = feedback_service.compute_marking_summary(sample_scenario.id)
+        assert summary["total_feedback"] == 0
+        assert summary["coverage"] == {
+            "total_requirements": 0,
+            "requirements_with_feedback": 0,
+            "coverage_ratio": 0.0,
+        }
+
     def test_set_marking_status(
         self, feedback_service, sample_scenario
     ):
@@ -125,3 +240,169 @@ class TestFeedbackServiceMarking:
             sample_scenario.id, "submitted"
         )
         assert s.marking_status.value == "submitted"
+
+
+class TestFeedbackServiceBatch:
+    """FeedbackService.add_feedback_batch."""
+
+    @pytest.fixture
+    def refs(self, requirements_repo, stakeholders_repo, chat_history_repo, chat_message_repo, sample_scenario):
+        req = requirements_repo.create(
+            scenario_id=sample_scenario.id, type="functional", requirement="R1"
+        )
+        st = stakeholders_repo.create(
+            scenario_id=sample_scenario.id, name="S", role="R", prompt="P"
+        )
+        h = chat_history_repo.create(stakeholder_id=st.id)
+        msgs = [
+            chat_message_repo.create(chat_history_id=h.id, sent_by="User", message=f"M{i}")
+            for i in range(3)
+        ]
+        return req, msgs
+
+    def test_creates_all_items_in_order(self, feedback_service, refs, sample_scenario):
+        req, msgs = refs
+        items = [{"feedback": "On requirement", "requirement_id": req.id}]
+        items += [{"feedback": f"On {m.message}", "chat_message_id": m.id} for m in msgs]
+        items.append({"feedback": "General", "scenario_id": sample_scenario.id})
+
+        created = feedback_service.add_feedback_batch(items)
+
+        assert [f.feedback for f in created] == [item["feedback"] for item in items]
+        assert {f.scenario_id for f in created} == {sample_scenario.id}
+        assert created[1].chat_message_id == msgs[0].id
+
+    def test_select_count_is_independent_of_size(self, feedback_service, refs, statements):
+        req, msgs = refs
+        items = [{"feedback": f"F{i}", "chat_message_id": msgs[i % 3].id} for i in range(30)]
+        items.append({"feedback": "R", "requirement_id": req.id})
+        feedback_service.feedback.db.expunge_all()
+
+        statements.clear()
+        created = feedback_service.add_feedback_batch(items)
+
+        assert len(created) == 31
+        # get_many, scenario_ids, the reload after insert and the marking
+        # stats requirement check; the INSERT is one batched statement on
+        # PostgreSQL (SQLite runs it per row to keep RETURNING order).
+        assert statements.verbs().count("SELECT") == 4
+
+    def test_missing_reference_creates_nothing(self, feedback_service, refs):
+        req, msgs = refs
+        with pytest.raises(ValueError):
+            feedback_service.add_feedback_batch([
+                {"feedback": "ok", "requirement_id": req.id},
+                {"feedback": "bad", "chat_message_id": 99999},
+            ])
+
+        assert feedback_service.feedback.all() == []
+
+    def test_general_feedback_requires_scenario(self, feedback_service):
+        with pytest.raises(ValueError):
+            feedback_service.add_feedback_batch([{"feedback": "General"}])
+
+    def test_empty_batch(self, feedback_service):
+        assert feedback_service.add_feedback_batch([]) == []
+
+
+class TestFeedbackServiceBatchAuthorization:
+    """add_feedback_batch(marker_id=...) only lets teachers mark their students."""
+
+    @pytest.fixture
+    def setup(self, users_repo, class_repo, students_repo, class_teacher_repo, scenarios_repo):
+        teacher = users_repo.create(**make_user_data(username="t", email="t@ex.com"))
+        classes = [class_repo.create(name=f"C{i}") for i in range(2)]
+        scenario_ids = []
+        for i, klass in enumerate(classes):
+            class_teacher_repo.create(class_id=klass.id, teacher_id=teacher.id)
+            student = users_repo.create(**make_user_data(username=f"s{i}", email=f"s{i}@ex.com"))
+            students_repo.create(class_id=klass.id, user_id=student.id)
+            scenario_ids.append(scenarios_repo.create(owner_id=student.id, title=f"S{i}").id)
+        return teacher.id, scenario_ids
+
+    def test_teacher_of_owner_can_mark(self, feedback_service, setup):
+        teacher_id, scenario_ids = setup
+
+        created = feedback_service.add_feedback_batch(
+            [{"feedback": "F", "scenario_id": scenario_ids[0]}], marker_id=teacher_id
+        )
+
+        assert len(created) == 1
+
+    def test_owners_must_share_one_class(self, feedback_service, feedback_repo, setup):
+        teacher_id, scenario_ids = setup
+        items = [{"feedback": "F", "scenario_id": id} for id in scenario_ids]
+
+        with pytest.raises(PermissionError):
+            feedback_service.add_feedback_batch(items, marker_id=teacher_id)
+        assert feedback_repo.list() == []
+
+    def test_student_cannot_mark_own_scenario(self, feedback_service, scenarios_repo, setup):
+        _, scenario_ids = setup
+        owner_id = scenarios_repo.get(scenario_ids[0]).owner_id
+
+        with pytest.raises(PermissionError):
+            feedback_service.add_feedback_batch(
+                [{"feedback": "F", "scenario_id": scenario_ids[0]}], marker_id=owner_id
+            )
+
+    def test_unknown_scenario(self, feedback_service, setup):
+        teacher_id, _ = setup
+
+        with pytest.raises(ValueError, match="Scenario 999 not found"):
+            feedback_service.add_feedback_batch(
+                [{"feedback": "F", "scenario_id": 999}], marker_id=teacher_id
+            )
+
+
+class TestFeedbackServiceClassSummary:
+    """FeedbackService.compute_class_marking_summary."""
+
+    @pytest.fixture
+    def class_id(self, class_repo, users_repo, students_repo, scenarios_repo, requirements_repo, feedback_service):
+        klass = class_repo.create(name="Class")
+        for i in range(3):
+            user = users_repo.create(**make_user_data(username=f"s{i}", email=f"s{i}@ex.com"))
+            students_repo.create(class_id=klass.id, user_id=user.id)
+            for j in range(i):
+                scenario = scenarios_repo.create(owner_id=user.id, title=f"S{i}-{j}")
+                reqs = [
+                    requirements_repo.create(scenario_id=scenario.id, type="functional", requirement=f"R{k}")
+                    for k in range(2)
+                ]
+                feedback_service.add_feedback_batch(
+                    [{"feedback": "x", "requirement_id": reqs[0].id}] * (j + 1)
+                )
+        return klass.id
+
+    def test_summary_per_student_and_scenario(self, feedback_service, class_id):
+        page = feedback_service.compute_class_marking_summary(class_id)
+
+        assert page.next_after_id is None
+        assert [len(s["scenarios"]) for s in page.items] == [0, 1, 2]
+        last = page.items[2]["scenarios"]
+        assert [s["total_feedback"] for s in last] == [1, 2]
+        assert last[1]["marking_status"] == "draft"
+        assert last[1]["coverage"] == {
+            "total_requirements": 2,
+            "requirements_with_feedback": 1,
+            "coverage_ratio": 0.5,
+        }
+
+    def test_paginates_by_student_in_two_queries(self, feedback_service, class_id, statements):
+        feedback_service.feedback.db.expunge_all()
+        statements.clear()
+        first = feedback_service.compute_class_marking_summary(class_id, limit=2)
+
+        assert len(first.items) == 2
+        assert len(statements) == 2
+
+        second = feedback_service.compute_class_marking_summary(
+            class_id, after_id=first.next_after_id, limit=2
+        )
+        assert len(second.items) == 1
+        assert second.next_after_id is None
+
+    def test_requires_students_repo(self, feedback_repo):
+        with pytest.raises(RuntimeError):
+            FeedbackService(feedback_repo).compute_class_marking_summary(1)
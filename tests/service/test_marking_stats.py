@@ -0,0 +1,128 @@
+"""Tests for the incrementally maintained marking counters."""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.cli import main
+from db.models import ScenarioMarkingStats
+
+
+def _expected(feedback_service, scenario_id):
+    """The live aggregate, in get_marking_stats' shape."""
+    summary = feedback_service.compute_marking_summary(scenario_id)
+    summary.pop("per_chat_message")
+    return summary
+
+
+@pytest.fixture
+def scenario_id(scenarios_service, sample_user):
+    scenario = scenarios_service.create_scenario(
+        owner_id=sample_user.id,
+        title="Scenario",
+        stakeholders=[{"name": "S", "role": "Client"}],
+        requirements=[{"type": "functional", "requirement": f"R{i}"} for i in range(3)],
+    )
+    return scenario.id
+
+
+@pytest.fixture
+def message_ids(scenarios_service, chats_service, scenario_id):
+    stakeholder = scenarios_service.list_stakeholders(scenario_id)[0]
+    history = chats_service.get_history_for_stakeholder(stakeholder.id)
+    return [
+        chats_service.append_message(history.id, sent_by="User", message=f"M{i}").id
+        for i in range(2)
+    ]
+
+
+class TestMarkingStats:
+    """Counters stay equal to the live aggregates through every change."""
+
+    def test_consistent_through_feedback_and_requirement_changes(
+        self, feedback_service, scenarios_service, chats_service, scenario_id, message_ids
+    ):
+        requirements = scenarios_service.list_requirements(scenario_id)
+        r0, r1, r2 = (r.id for r in requirements)
+
+        def check():
+            assert feedback_service.get_marking_stats(scenario_id) == _expected(feedback_service, scenario_id)
+
+        check()
+        first = feedback_service.add_feedback_to_requirement(r0, "a")
+        check()
+        feedback_service.add_feedback_batch([
+            {"feedback": "b", "requirement_id": r0},
+            {"feedback": "c", "requirement_id": r1},
+            {"feedback": "d", "chat_message_id": message_ids[0]},
+            {"feedback": "e", "scenario_id": scenario_id},
+        ])
+        check()
+        feedback_service.add_feedback_to_message(message_ids[1], "f")
+        feedback_service.add_general_feedback(scenario_id, "g")
+        check()
+
+        feedback_service.delete_feedback(first.id)
+        check()
+        feedback_service.restore_feedback(first.id)
+        check()
+
+        scenarios_service.delete_requirement(r0)
+        check()
+        scenarios_service.add_requirement(scenario_id, type="functional", requirement="R3")
+        check()
+        scenarios_service.restore_requirement(r0)
+        check()
+
+        history_id = chats_service.list_histories()[0].id
+        chats_service.delete_history(history_id)
+        check()
+        chats_service.restore_history(history_id)
+        check()
+
+        scenarios_service.clear_requirements(scenario_id)
+        check()
+
+        stats = feedback_service.get_marking_stats(scenario_id)
+        assert stats["total_feedback"] == 7
+        assert stats["per_requirement"] == {r0: 2, r1: 1}
+        assert stats["coverage"]["total_requirements"] == 0
+        assert r2 not in stats["per_requirement"]
+
+    def test_new_scenario_starts_at_zero(self, feedback_service, scenarios_service, sample_user):
+        scenario = scenarios_service.create_scenario(owner_id=sample_user.id, title="Empty")
+
+        assert feedback_service.get_marking_stats(scenario.id) == _expected(feedback_service, scenario.id)
+
+    def test_scenario_delete_and_restore(self, feedback_service, scenarios_service, scenario_id):
+        requirement = scenarios_service.list_requirements(scenario_id)[0]
+        feedback_service.add_feedback_to_requirement(requirement.id, "a")
+
+        scenarios_service.delete_scenario(scenario_id)
+        assert feedback_service.get_marking_stats(scenario_id) is None
+
+        scenarios_service.restore_scenario(scenario_id)
+        assert feedback_service.get_marking_stats(scenario_id) == _expected(feedback_service, scenario_id)
+
+    def test_recompute_matches_incremental(
+        self, feedback_service, marking_stats_repo, scenario_id, message_ids
+    ):
+        requirement_id = feedback_service.requirements.list(scenario_id=scenario_id)[0].id
+        feedback_service.add_feedback_batch(
+            [{"feedback": "x", "requirement_id": requirement_id}] * 3
+            + [{"feedback": "y", "chat_message_id": message_ids[0]}]
+        )
+        incremental = feedback_service.get_marking_stats(scenario_id)
+
+        assert marking_stats_repo.recompute() == 1
+        assert feedback_service.get_marking_stats(scenario_id) == incremental
+
+    def test_rebuild_cli(self, engine, feedback_service, scenario_id, capsys):
+        feedback_service.add_general_feedback(scenario_id, "x")
+        db = feedback_service.feedback.db
+        db.query(ScenarioMarkingStats).delete()
+        db.commit()
+
+        factory = sessionmaker(bind=engine)
+        assert main(["rebuild-marking-stats", "--scenario-id", str(scenario_id)], factory) == 0
+
+        assert "1 scenario(s)" in capsys.readouterr().out
+        assert feedback_service.get_marking_stats(scenario_id)["total_feedback"] == 1
@@ -0,0 +1,140 @@
+"""Tests for the streaming CSV roster import."""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.cli import main
+from app.services.roster_import_service import RosterImportService
+
+HEADER = "fname,lname,username,email,password\n"
+
+
+def roster(*rows):
+    return [HEADER] + [",".join(row) + "\n" for row in rows]
+
+
+def student(i):
+    return ("Student", str(i), f"student{i}", f"student{i}@example.com", f"pw{i}")
+
+
+@pytest.fixture
+def roster_import_service(users_repo, classes_service):
+    return RosterImportService(users_repo, classes_service, hasher=lambda p: "hashed:" + p)
+
+
+@pytest.fixture
+def class_id(sample_class):
+    return sample_class.id
+
+
+class TestRosterImport:
+    """import_csv creates and enrolls users chunk by chunk."""
+
+    def test_creates_and_enrolls(
+        self, roster_import_service, classes_service, users_repo, class_id
+    ):
+        report = roster_import_service.import_csv(
+            roster(*(student(i) for i in range(5))), class_id=class_id, chunk_size=2
+        )
+
+        assert (report.rows, report.created, report.enrolled, report.failed) == (5, 5, 5, 0)
+        user = users_repo.list(username="student3")[0]
+        assert user.password_hash == "hashed:pw3"
+        assert len(classes_service.list_students(class_id)) == 5
+
+    def test_statements_per_chunk(self, roster_import_service, statements, class_id):
+        statements.clear()
+        roster_import_service.import_csv(
+            roster(*(student(i) for i in range(50))), class_id=class_id, chunk_size=25
+        )
+
+        # Per chunk: one INSERT for users, one upsert for memberships.
+        assert statements.verbs().count("INSERT") == 4
+
+    def test_reports_bad_rows_by_line(self, roster_import_service, class_id):
+        report = roster_import_service.import_csv(
+            roster(
+                student(1),
+                ("No", "Email", "noemail", "", "pw"),
+                ("Bad", "Email", "bademail", "not-an-email", "pw"),
+                ("Dup", "User", "student1", "other@example.com", "pw"),
+                student(2),
+            ),
+            class_id=class_id,
+        )
+
+        assert (report.rows, report.created, report.failed) == (5, 2, 3)
+        assert [line for line, _ in report.errors] == [3, 4, 5]
+        assert report.errors[0][1] == "Missing email"
+
+    def test_over_long_cells_are_row_errors(self, roster_import_service, class_id):
+        report = roster_import_service.import_csv(
+            roster(
+                ("Long", "Name", "u" * 101, "long@example.com", "pw"),
+                ("Long", "Email", "longemail", "e" * 250 + "@example.com", "pw"),
+                student(1),
+            ),
+            class_id=class_id,
+        )
+
+        assert (report.created, report.failed) == (1, 2)
+        assert report.errors == [
+            (2, "username is longer than 100 characters"),
+            (3, "email is longer than 255 characters"),
+        ]
+
+    @pytest.fixture
+    def existing_id(self, users_repo):
+        users_repo.create(
+            fname="Other", lname="Two", username="taken",
+            email="taken@example.com", password_hash="x",
+        )
+        return users_repo.create(
+            fname="Old", lname="One", username="student1",
+            email="student1@example.com", password_hash="x",
+        ).id
+
+    def test_existing_accounts_are_not_enrolled(
+        self, roster_import_service, classes_service, class_id, existing_id
+    ):
+        report = roster_import_service.import_csv(
+            roster(student(1), ("New", "Two", "taken", "new@example.com", "pw")),
+            class_id=class_id,
+        )
+
+        assert (report.created, report.existing, report.enrolled, report.failed) == (0, 0, 0, 2)
+        assert report.errors == [
+            (2, "Account already exists and was not enrolled"),
+            (3, "Username or email belongs to another account"),
+        ]
+        assert classes_service.list_students(class_id) == []
+
+    def test_link_existing_accounts(
+        self, roster_import_service, users_repo, classes_service, class_id, existing_id
+    ):
+        report = roster_import_service.import_csv(
+            roster(student(1), ("New", "Two", "taken", "new@example.com", "pw")),
+            class_id=class_id,
+            link_existing=True,
+        )
+
+        assert (report.created, report.existing, report.enrolled, report.failed) == (0, 1, 1, 1)
+        assert report.errors == [(3, "Username or email belongs to another account")]
+        assert [m.user_id for m in classes_service.list_students(class_id)] == [existing_id]
+        assert users_repo.get(existing_id).password_hash == "x"
+
+    def test_rejects_missing_columns_and_class(self, roster_import_service, class_id):
+        with pytest.raises(ValueError):
+            roster_import_service.import_csv(["username,email\n"], class_id=class_id)
+        with pytest.raises(ValueError):
+            roster_import_service.import_csv(roster(student(1)), class_id=99999)
+
+    def test_import_roster_cli(self, engine, tmp_path, classes_service, class_id, capsys):
+        path = tmp_path / "roster.csv"
+        path.write_text("".join(roster(student(1), student(2))))
+
+        factory = sessionmaker(bind=engine)
+        argv = ["import-roster", str(path), "--class-id", str(class_id), "--workers", "2"]
+        assert main(argv, factory) == 0
+
+        assert "2 created" in capsys.readouterr().out
+        assert len(classes_service.list_students(class_id)) == 2
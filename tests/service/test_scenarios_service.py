@@ -0,0 +1,331 @@
+"""Tests for ScenariosService."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from db.crud.soft_delete import with_deleted
+from db.models import ScenarioCategories
+from db.unit_of_work import unit_of_work
+
+
+class TestScenariosServiceCreate:
+    """ScenariosService scenario creation."""
+
+    def test_create_scenario_commits_once(
+        self, scenarios_service, categories_repo, sample_user, commits
+    ):
+        category = categories_repo.create(name="Cat")
+        commits.clear()
+
+        scenario = scenarios_service.create_scenario(
+            owner_id=sample_user.id,
+            title="Scenario",
+            category_ids=[category.id],
+            stakeholders=[
+                {"name": "A", "role": "Client"},
+                {"name": "B", "role": "User"},
+            ],
+            requirements=[
+                {"type": "functional", "requirement": "R1"},
+                {"type": "non-functional", "info": "R2"},
+            ],
+        )
+
+        assert len(commits) == 1
+        assert len(scenarios_service.list_stakeholders(scenario.id)) == 2
+        assert len(scenarios_service.list_requirements(scenario.id)) == 2
+        assert len(scenarios_service.scenario_categories.list(scenario_id=scenario.id)) == 1
+
+    def test_create_scenario_is_atomic(self, scenarios_service, sample_user):
+        with pytest.raises(ValueError):
+            scenarios_service.create_scenario(
+                owner_id=sample_user.id,
+                title="Broken",
+                stakeholders=[{"name": "A", "role": "Client"}, {"name": "B"}],
+            )
+
+        assert scenarios_service.list_scenarios(include_deleted=True) == []
+        assert scenarios_service.stakeholders.all() == []
+
+
+class TestScenariosServiceDelete:
+    """ScenariosService cascading delete/restore."""
+
+    def test_delete_and_restore_scenario_cascade(self, scenarios_service, sample_user):
+        scenario = scenarios_service.create_scenario(
+            owner_id=sample_user.id,
+            title="Scenario",
+            stakeholders=[{"name": "A", "role": "Client"}],
+            requirements=[{"type": "functional", "requirement": "R1"}],
+        )
+        scenario_id = scenario.id
+
+        deleted = scenarios_service.delete_scenario(scenario_id)
+        assert deleted.deleted_at is not None
+        assert scenarios_service.list_stakeholders(scenario_id) == []
+        assert scenarios_service.list_requirements(scenario_id) == []
+
+        restored = scenarios_service.restore_scenario(scenario_id)
+        assert restored.deleted_at is None
+        assert len(scenarios_service.list_stakeholders(scenario_id)) == 1
+        assert len(scenarios_service.list_requirements(scenario_id)) == 1
+
+    def test_delete_missing_scenario(self, scenarios_service):
+        assert scenarios_service.delete_scenario(99999) is None
+
+
+class TestScenariosServiceDetail:
+    """ScenariosService.get_scenario_detail eager loading."""
+
+    @pytest.fixture
+    def scenario_id(self, scenarios_service, categories_repo, sample_user):
+        categories = [categories_repo.create(name=f"Cat {i}") for i in range(3)]
+        scenario_id = scenarios_service.create_scenario(
+            owner_id=sample_user.id,
+            title="Scenario",
+            category_ids=[c.id for c in categories],
+            stakeholders=[{"name": f"S{i}", "role": "Client"} for i in range(5)],
+            requirements=[{"type": "functional", "requirement": f"R{i}"} for i in range(5)],
+        ).id
+        stakeholders = scenarios_service.list_stakeholders(scenario_id)
+        requirements = scenarios_service.list_requirements(scenario_id)
+        scenarios_service.delete_stakeholder(stakeholders[0].id)
+        scenarios_service.delete_requirement(requirements[0].id)
+        scenarios_service.remove_category_from_scenario(scenario_id, categories[0].id)
+        scenarios_service.scenarios.db.expunge_all()
+        return scenario_id
+
+    def test_loads_active_children_in_four_queries(self, scenarios_service, scenario_id, statements):
+        detail = scenarios_service.get_scenario_detail(scenario_id)
+
+        assert len(detail.stakeholders) == 4
+        assert len(detail.requirements) == 4
+        assert sorted(link.category.name for link in detail.categories) == ["Cat 1", "Cat 2"]
+        assert len(statements) == 4
+
+    def test_owner_filter(self, scenarios_service, scenario_id, statements):
+        owner_id = scenarios_service.get_scenario(scenario_id).owner_id
+        assert scenarios_service.get_scenario_detail(scenario_id, owner_id=owner_id) is not None
+        statements.clear()
+
+        assert scenarios_service.get_scenario_detail(scenario_id, owner_id=owner_id + 1) is None
+        assert len(statements) == 1
+
+    def test_deleted_scenario_is_hidden(self, scenarios_service, scenario_id):
+        scenarios_service.delete_scenario(scenario_id)
+
+        assert scenarios_service.get_scenario_detail(scenario_id) is None
+
+    def test_replaces_stale_loaded_collections(self, scenarios_service, scenario_id):
+        loaded = scenarios_service.get_scenario(scenario_id)
+        assert len(loaded.stakeholders) == 4
+
+        with unit_of_work(scenarios_service.scenarios.db):
+            scenarios_service.delete_stakeholder(loaded.stakeholders[0].id)
+            detail = scenarios_service.get_scenario_detail(scenario_id)
+
+            assert detail is loaded
+            assert len(detail.stakeholders) == 3
+
+
+class TestScenariosServiceBulkCreate:
+    """create_scenario bulk inserts and returns the populated aggregate."""
+
+    def _create(self, scenarios_service, owner_id, category_ids, size):
+        return scenarios_service.create_scenario(
+            owner_id=owner_id,
+            title="Scenario",
+            category_ids=category_ids,
+            stakeholders=[{"name": f"S{i}", "role": "Client"} for i in range(size)],
+            requirements=[{"type": "functional", "requirement": f"R{i}"} for i in range(size)],
+        )
+
+    def test_select_count_is_independent_of_size(
+        self, scenarios_service, categories_repo, sample_user, statements
+    ):
+        category_ids = [categories_repo.create(name=f"C{i}").id for i in range(3)]
+        owner_id = sample_user.id
+
+        statements.clear()
+        self._create(scenarios_service, owner_id, category_ids, 2)
+        small = statements.verbs().count("SELECT")
+
+        statements.clear()
+        self._create(scenarios_service, owner_id, category_ids, 20)
+        assert statements.verbs().count("SELECT") == small
+
+    def test_returns_populated_aggregate(
+        self, scenarios_service, categories_repo, sample_user, statements
+    ):
+        category = categories_repo.create(name="Cat")
+        scenario = self._create(scenarios_service, sample_user.id, [category.id, category.id], 3)
+
+        statements.clear()
+        assert scenario.title == "Scenario"
+        assert [s.name for s in scenario.stakeholders] == ["S0", "S1", "S2"]
+        assert [r.requirement for r in scenario.requirements] == ["R0", "R1", "R2"]
+        assert [link.category.name for link in scenario.categories] == ["Cat"]
+        assert statements == []
+
+    def test_unknown_category_writes_nothing(self, scenarios_service, sample_user):
+        with pytest.raises(ValueError):
+            self._create(scenarios_service, sample_user.id, [99999], 2)
+
+        assert scenarios_service.list_scenarios(include_deleted=True) == []
+
+
+class TestScenariosServiceCategories:
+    """set_categories reconciles links with set-based statements."""
+
+    @pytest.fixture
+    def scenario_id(self, scenarios_service, sample_user):
+        return scenarios_service.create_scenario(owner_id=sample_user.id, title="S").id
+
+    @pytest.fixture
+    def category_ids(self, categories_repo):
+        return [categories_repo.create(name=f"C{i}").id for i in range(6)]
+
+    def _linked(self, scenarios_service, scenario_id):
+        links = scenarios_service.scenario_categories.list(scenario_id=scenario_id)
+        return sorted(link.category_id for link in links)
+
+    def test_statement_count_is_independent_of_size(
+        self, scenarios_service, scenario_id, category_ids, statements
+    ):
+        statements.clear()
+        scenarios_service.set_categories(scenario_id, category_ids[:1])
+        small = len(statements)
+
+        statements.clear()
+        scenarios_service.set_categories(scenario_id, category_ids[1:])
+        assert len(statements) == small
+
+    def test_replaces_links(self, scenarios_service, scenario_id, category_ids):
+        scenarios_service.set_categories(scenario_id, category_ids[:3])
+        links = scenarios_service.set_categories(scenario_id, category_ids[2:4])
+
+        assert sorted(link.category_id for link in links) == category_ids[2:4]
+        assert self._linked(scenarios_service, scenario_id) == category_ids[2:4]
+
+    def test_restores_deleted_links(
+        self, scenarios_service, scenario_id, category_ids, db_session
+    ):
+        first = scenarios_service.set_categories(scenario_id, category_ids[:2])
+        scenarios_service.set_categories(scenario_id, [])
+        restored = scenarios_service.set_categories(scenario_id, category_ids[:2])
+
+        assert {link.id for link in restored} == {link.id for link in first}
+        rows = db_session.scalars(
+            with_deleted(select(ScenarioCategories).filter_by(scenario_id=scenario_id))
+        ).all()
+        assert len(rows) == 2
+
+    def test_unknown_category_changes_nothing(
+        self, scenarios_service, scenario_id, category_ids
+    ):
+        scenarios_service.set_categories(scenario_id, category_ids[:2])
+
+        with pytest.raises(ValueError):
+            scenarios_service.set_categories(scenario_id, [category_ids[3], 99999])
+
+        assert self._linked(scenarios_service, scenario_id) == category_ids[:2]
+
+    def test_duplicate_link_is_rejected(
+        self, scenario_categories_repo, scenario_id, category_ids, db_session
+    ):
+        scenario_categories_repo.create(scenario_id=scenario_id, category_id=category_ids[0])
+        with pytest.raises(IntegrityError):
+            scenario_categories_repo.create(scenario_id=scenario_id, category_id=category_ids[0])
+        db_session.rollback()
+
+
+class TestScenariosServiceSync:
+    """sync_stakeholders / sync_requirements apply only the difference."""
+
+    @pytest.fixture
+    def scenario_id(self, scenarios_service, sample_user):
+        return scenarios_service.create_scenario(
+            owner_id=sample_user.id,
+            title="S",
+            stakeholders=[{"name": f"S{i}", "role": "Client"} for i in range(3)],
+            requirements=[{"type": "functional", "requirement": f"R{i}"} for i in range(3)],
+        ).id
+
+    def _stakeholder_items(self, scenarios_service, scenario_id):
+        return [
+            {"id": s.id, "name": s.name, "role": s.role, "desc": s.desc, "prompt": s.prompt}
+            for s in scenarios_service.list_stakeholders(scenario_id)
+        ]
+
+    def test_unchanged_list_writes_nothing(self, scenarios_service, scenario_id, statements):
+        items = self._stakeholder_items(scenarios_service, scenario_id)
+
+        statements.clear()
+        rows = scenarios_service.sync_stakeholders(scenario_id, items)
+
+        assert [s.id for s in rows] == [item["id"] for item in items]
+        assert set(statements.verbs()) == {"SELECT"}
+
+    def test_applies_insert_update_and_delete(self, scenarios_service, scenario_id, statements):
+        first, second, third = self._stakeholder_items(scenarios_service, scenario_id)
+        second["name"] = "Renamed"
+
+        statements.clear()
+        rows = scenarios_service.sync_stakeholders(
+            scenario_id, [first, second, {"name": "New", "role": "Tester"}]
+        )
+
+        assert [s.name for s in rows] == ["S0", "Renamed", "New"]
+        assert [s.id for s in rows][:2] == [first["id"], second["id"]]
+        assert third["id"] not in {s.id for s in scenarios_service.list_stakeholders(scenario_id)}
+        # The rename, then one cascade UPDATE per table: stakeholder,
+        # chat_history, chat_message, feedback_reference.
+        assert statements.verbs().count("UPDATE") == 5
+
+    def test_kept_stakeholders_keep_chat_history(
+        self, scenarios_service, chat_history_repo, scenario_id
+    ):
+        items = self._stakeholder_items(scenarios_service, scenario_id)
+        history = chat_history_repo.create(stakeholder_id=items[0]["id"])
+        items[0]["role"] = "Manager"
+
+        scenarios_service.sync_stakeholders(scenario_id, items[:1])
+
+        assert [h.id for h in chat_history_repo.list(stakeholder_id=items[0]["id"])] == [history.id]
+
+    def test_removed_stakeholders_cascade(
+        self, scenarios_service, chats_service, feedback_service, marking_stats_repo, scenario_id
+    ):
+        items = self._stakeholder_items(scenarios_service, scenario_id)
+        history = chats_service.get_history_for_stakeholder(items[1]["id"])
+        message = chats_service.append_message(history.id, sent_by="User", message="M")
+        feedback_service.add_feedback_to_message(message.id, "F")
+        assert marking_stats_repo.get(scenario_id).total_feedback == 1
+
+        scenarios_service.sync_stakeholders(scenario_id, items[:1])
+
+        assert chats_service.get_history_for_stakeholder(items[1]["id"], create=False) is None
+        assert chats_service.list_messages(history.id) == []
+        assert feedback_service.list_feedback_for_scenario(scenario_id) == []
+        assert marking_stats_repo.get(scenario_id).total_feedback == 0
+
+    def test_unknown_id_writes_nothing(self, scenarios_service, scenario_id, statements):
+        items = self._stakeholder_items(scenarios_service, scenario_id)
+
+        statements.clear()
+        with pytest.raises(ValueError):
+            scenarios_service.sync_stakeholders(
+                scenario_id, items + [{"id": 99999, "name": "X", "role": "Y"}]
+            )
+
+        assert set(statements.verbs()) == {"SELECT"}
+
+    def test_requirements_update_stats(self, scenarios_service, marking_stats_repo, scenario_id):
+        current = scenarios_service.list_requirements(scenario_id)
+        items = [{"id": r.id, "type": r.type, "requirement": r.requirement} for r in current[:1]]
+        items += [{"type": "non-functional", "requirement": f"N{i}"} for i in range(4)]
+
+        rows = scenarios_service.sync_requirements(scenario_id, items)
+
+        assert [r.requirement for r in rows] == ["R0", "N0", "N1", "N2", "N3"]
+        assert marking_stats_repo.get(scenario_id).total_requirements == 5